@@ -0,0 +1,190 @@
+import math
+import mmap
+import struct
+from array import array
+from compiled_graph import graph_pool, with_worker_graph
+from heuristics import HeuristicProvider
+
+# File layout: header, then two n x n tables in row order, each padded to
+# 8 bytes: shortest distances (float32, rounded down so they stay lower
+# bounds) and fewest coins (int32, UNREACHABLE where no route exists).
+MAGIC = b"CCPFAPT1"
+VERSION = 1
+HEADER = struct.Struct("<8sIIq")  # magic, format version, cities, directed roads
+UNREACHABLE = 2 ** 31 - 1
+FLOAT32_EXACT = 2 ** 24  # integers up to here are exact in float32
+
+def _round_down(value: float, stored: float):
+    """Largest float32 not above a non-negative value, given its round-to-nearest float32"""
+    if stored <= value:
+        return stored
+    bits = struct.unpack('<I', struct.pack('<f', stored))[0]
+    return struct.unpack('<f', struct.pack('<I', bits - 1))[0]
+
+
+def _rows(graph, sources, exact: bool):
+    """
+    Distance and coin rows for each source as (source, float32 bytes, int32 bytes).
+    Roads are undirected, so row s is also every city's cost to s.
+    """
+    rows = []
+    for source in sources:
+        distance = graph.dijkstra(source)
+        coins = graph.dijkstra(source, graph.coins)
+        distance_row = array('f', distance)
+        if not exact:
+            for i, value in enumerate(distance):
+                distance_row[i] = _round_down(value, distance_row[i])
+        coin_row = array('i', [UNREACHABLE if value == math.inf else int(value) for value in coins])
+        rows.append((source, distance_row.tobytes(), coin_row.tobytes()))
+    return rows
+
+
+def _table_bytes(n: int):
+    return 4 * n * n + (-4 * n * n % 8)
+
+
+class AllPairsTables:
+    """
+    Shortest distance and fewest coins between every pair of cities of a
+    CompiledGraph, kept in a memory-mapped file. They answer "is any route
+    within this budget" and "how short can a route be" in O(1), and as a
+    bounds cache for PathFinder they give the exact coin bound for pruning
+    and the exact distance as heuristic.
+    Meant for graphs of up to tens of thousands of cities: the file takes
+    8 bytes per pair of cities.
+    """
+
+    def __init__(self, graph, distances, coins):
+        self.graph = graph
+        self.n = graph.num_cities()
+        self.distances = distances  # flat, distances[u * n + v] = shortest distance u-v
+        self.coins = coins  # flat, coins[u * n + v] = fewest coins u-v
+        self._mmap = None
+
+    @classmethod
+    def build(cls, graph, path: str, workers: int = 0, chunk: int = 64):
+        """
+        Run a distance and a coin Dijkstra from every city and write the rows
+        to path, then map the file. workers > 0 spreads the sources over a
+        process pool (None for one per CPU); the graph is shipped to each
+        worker once.
+        """
+        n = graph.num_cities()
+        if sum(graph.coins) >= UNREACHABLE:
+            raise ValueError("Coin totals do not fit the int32 table.")
+        exact = all(d.is_integer() for d in graph.distances) and sum(graph.distances) <= FLOAT32_EXACT
+        table = _table_bytes(n)
+
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, n, graph.num_roads()))
+            f.truncate(HEADER.size + 2 * table)
+        with open(path, 'r+b') as f:
+            mm = mmap.mmap(f.fileno(), 0)
+        try:
+            chunks = [range(start, min(n, start + chunk)) for start in range(0, n, chunk)]
+            if workers == 0:
+                results = (_rows(graph, sources, exact) for sources in chunks)
+                cls._write_rows(mm, n, results)
+            else:
+                with graph_pool(graph, workers) as pool:
+                    cls._write_rows(mm, n, pool.map(with_worker_graph, [_rows] * len(chunks), chunks,
+                                                    [exact] * len(chunks)))
+            mm.flush()
+        finally:
+            mm.close()
+        return cls.load(path, graph)
+
+    @staticmethod
+    def _write_rows(mm, n: int, results):
+        coin_start = HEADER.size + _table_bytes(n)
+        for rows in results:
+            for source, distance_bytes, coin_bytes in rows:
+                mm[HEADER.size + 4 * n * source:HEADER.size + 4 * n * (source + 1)] = distance_bytes
+                mm[coin_start + 4 * n * source:coin_start + 4 * n * (source + 1)] = coin_bytes
+
+    @classmethod
+    def load(cls, path: str, graph):
+        """Memory-map a tables file written by build() for the same graph"""
+        with open(path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, num_cities, num_roads = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC or version != VERSION:
+            mm.close()
+            raise ValueError(f"{path} is not an all-pairs table file.")
+        if num_cities != graph.num_cities() or num_roads != graph.num_roads():
+            mm.close()
+            raise ValueError(f"{path} was built for a different graph.")
+
+        view = memoryview(mm)
+        table = _table_bytes(num_cities)
+        size = 4 * num_cities * num_cities
+        distances = view[HEADER.size:HEADER.size + size].cast('f')
+        coins = view[HEADER.size + table:HEADER.size + table + size].cast('i')
+        tables = cls(graph, distances, coins)
+        tables._mmap = mm
+        return tables
+
+    def lower_bound(self, start_name: str, goal_name: str):
+        """Shortest distance between two cities, math.inf if they are not connected"""
+        index_of = self.graph.index_of
+        return self.distances[index_of(start_name) * self.n + index_of(goal_name)]
+
+    def min_coins(self, start_name: str, goal_name: str):
+        """Fewest coins any route between two cities costs, math.inf if there is none"""
+        index_of = self.graph.index_of
+        coins = self.coins[index_of(start_name) * self.n + index_of(goal_name)]
+        return math.inf if coins == UNREACHABLE else coins
+
+    def feasible(self, start_name: str, goal_name: str, max_coins: int):
+        """True if some route between the two cities costs at most max_coins"""
+        return self.min_coins(start_name, goal_name) <= max_coins
+
+    def for_goal_id(self, graph, goal_id: int):
+        """Return (min_distance, min_coins) rows indexed by city id, like GoalBounds"""
+        n = self.n
+        return self.distances[goal_id * n:(goal_id + 1) * n], self.coins[goal_id * n:(goal_id + 1) * n]
+
+    def for_goal(self, goal_city):
+        """Return (min_distance, min_coins) mappings from City to its bound, like GoalBounds"""
+        distances, coins = self.for_goal_id(self.graph, self.graph.index_of(goal_city.cityName))
+        return _CityRow(distances, self.graph.index), _CityRow(coins, self.graph.index)
+
+    def memory_bytes(self):
+        return self.distances.nbytes + self.coins.nbytes
+
+    def close(self):
+        """Release the memory map of a loaded table file"""
+        if self._mmap is not None:
+            self.distances.release()
+            self.coins.release()
+            self._mmap.close()
+            self._mmap = None
+
+
+class _CityRow:
+    """One table row read through City objects, for searches on a CityGraph"""
+
+    def __init__(self, row, index):
+        self.row = row
+        self.index = index
+
+    def __getitem__(self, city):
+        return self.row[self.index[city.cityName]]
+
+    def get(self, city, default=None):
+        i = self.index.get(city.cityName)
+        return default if i is None else self.row[i]
+
+
+class AllPairsHeuristic(HeuristicProvider):
+    """Exact shortest distance to the goal from an AllPairsTables file"""
+
+    def __init__(self, tables):
+        self.tables = tables
+
+    def for_goal(self, goal_city):
+        return self.tables.for_goal(goal_city)[0].__getitem__
+
+    def for_goal_id(self, graph, goal_id: int):
+        return self.tables.for_goal_id(graph, goal_id)[0].__getitem__
@@ -0,0 +1,78 @@
+import time
+from collections import namedtuple
+from concurrent.futures import as_completed
+from compiled_graph import graph_pool, with_worker_graph
+from heuristics import EuclideanHeuristic
+from pathfinder import PathFinder
+
+Query = namedtuple('Query', ['start', 'goal', 'max_coins'])
+BatchResult = namedtuple('BatchResult', ['query', 'path', 'distance', 'coins'])
+
+def _solve_group(graph, start, queries):
+    """
+    Answer every query sharing one start city from a single search tree:
+    one Pareto search up to the largest budget answers all goals and budgets.
+    """
+    goals = sorted({query.goal for query in queries})
+    max_coins = max(query.max_coins for query in queries)
+    heuristic = EuclideanHeuristic(graph) if len(goals) == 1 else None
+    fronts = PathFinder().pareto_fronts_compiled(graph, start, goals, max_coins, heuristic=heuristic)
+    return [BatchResult(query, *fronts[query.goal].best_for(query.max_coins)) for query in queries]
+
+
+class BatchStats:
+    """Throughput counters for one batch run"""
+
+    def __init__(self):
+        self.queries = 0
+        self.groups = 0
+        self.elapsed = 0.0
+
+    def queries_per_second(self):
+        return self.queries / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __repr__(self):
+        return (f"BatchStats(queries={self.queries}, groups={self.groups}, "
+                f"elapsed={self.elapsed:.3f}s, qps={self.queries_per_second():.1f})")
+
+
+class BatchRunner:
+    """
+    Many-to-many query engine over a CompiledGraph.
+    Queries are grouped by start city and each group is solved by one search
+    in a process pool. The graph is shipped to each worker once, when the
+    pool starts, not with every task.
+    """
+
+    def __init__(self, graph, workers: int = None):
+        self.graph = graph
+        self.workers = workers  # None for one per CPU, 0 to run in this process
+        self.stats = BatchStats()
+
+    def run(self, queries):
+        """Yield a BatchResult per query as groups finish (not in input order)"""
+        groups = {}
+        for query in queries:
+            query = Query(*query)
+            groups.setdefault(query.start, []).append(query)
+
+        self.stats = BatchStats()
+        self.stats.groups = len(groups)
+        started = time.perf_counter()
+
+        if self.workers == 0:
+            for start, group in groups.items():
+                for result in _solve_group(self.graph, start, group):
+                    self.stats.queries += 1
+                    self.stats.elapsed = time.perf_counter() - started
+                    yield result
+            return
+
+        with graph_pool(self.graph, self.workers) as pool:
+            futures = [pool.submit(with_worker_graph, _solve_group, start, group)
+                       for start, group in groups.items()]
+            for future in as_completed(futures):
+                for result in future.result():
+                    self.stats.queries += 1
+                    self.stats.elapsed = time.perf_counter() - started
+                    yield result
@@ -0,0 +1,673 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from all_pairs import AllPairsTables
+from batch import BatchRunner
+from bounds import GoalBounds
+from compiled_graph import CompiledGraph
+from contraction import ContractionHierarchy
+from generators import grid_graph, generate, with_resources
+from heuristics import StoredHeuristic, ZeroHeuristic, EuclideanHeuristic
+from landmarks import LandmarkIndex, LandmarkHeuristic
+from pathfinder import PathFinder
+from search_stats import JsonLinesWriter
+from tracing import SearchTrace, RingBufferTrace, CallbackTrace
+
+
+def random_queries(names, count: int, max_budget: int, seed: int = 0):
+    """Pick reproducible (start, goal, budget) triples"""
+    rng = random.Random(seed)
+    return [(*rng.sample(names, 2), rng.randint(0, max_budget)) for _ in range(count)]
+
+
+def run_queries(pathfinder, graph, queries, heuristic=None, bounds=None):
+    """Run every query on a CompiledGraph, returning (total expansions, seconds, results)"""
+    expansions = 0
+    results = []
+    start = time.perf_counter()
+    for start_name, goal_name, budget in queries:
+        results.append(pathfinder.a_star_compiled(graph, start_name, goal_name, budget,
+                                                  heuristic=heuristic, bounds=bounds))
+        expansions += pathfinder.get_expansions()
+    return expansions, time.perf_counter() - start, results
+
+
+def bench_landmarks(size: int = 100, queries: int = 50, landmarks: int = 8, seed: int = 0):
+    """Compare the stored heuristic, the Euclidean bound and ALT on a grid"""
+    graph = grid_graph(size, size, seed=seed).compile()
+    names = list(graph.names)
+    batch = random_queries(names, queries, max_budget=5 * size, seed=seed)
+
+    start = time.perf_counter()
+    index = LandmarkIndex.build(graph, landmarks)
+    build_time = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "landmarks.alt")
+        index.save(path)
+        start = time.perf_counter()
+        index = LandmarkIndex.load(path, graph)
+        load_time = time.perf_counter() - start
+
+        print(f"{graph.num_cities()} cities, {graph.num_roads()} directed roads, {len(batch)} queries")
+        print(f"ALT: {index.k} landmarks, build {build_time:.2f}s, mmap load {load_time * 1000:.2f}ms, "
+              f"{os.path.getsize(path)} bytes on disk")
+
+        pathfinder = PathFinder()
+        providers = [("stored", StoredHeuristic()),
+                     ("euclidean", EuclideanHeuristic(graph)),
+                     ("landmarks", LandmarkHeuristic(index))]
+        baseline = None
+        for name, provider in providers:
+            expansions, seconds, results = run_queries(pathfinder, graph, batch, provider)
+            distances = [distance for _, distance, _ in results]
+            if baseline is None:
+                baseline = distances
+            elif distances != baseline:
+                raise AssertionError(f"{name} heuristic changed an optimal distance")
+            print(f"{name:>10}: {expansions:>9} expansions, {seconds * 1000 / len(batch):8.2f} ms/query")
+        index.close()
+
+
+def bench_bounds(size: int = 60, queries: int = 30, slack: int = 2, seed: int = 0):
+    """Compare plain Euclidean A* with coin-bound pruning on tight budgets"""
+    graph = grid_graph(size, size, seed=seed).compile()
+    rng = random.Random(seed)
+    bounds = GoalBounds()
+
+    # Budgets just above the cheapest possible route, where pruning matters most
+    batch = []
+    start = time.perf_counter()
+    for _ in range(queries):
+        start_name, goal_name = rng.sample(list(graph.names), 2)
+        _, min_coins = bounds.for_goal_id(graph, graph.index_of(goal_name))
+        batch.append((start_name, goal_name, int(min_coins[graph.index_of(start_name)]) + rng.randint(0, slack)))
+    precompute = time.perf_counter() - start
+
+    print(f"{graph.num_cities()} cities, {len(batch)} tight-budget queries, "
+          f"bounds precompute {precompute * 1000 / len(batch):.2f} ms/goal")
+    pathfinder = PathFinder()
+    plain = run_queries(pathfinder, graph, batch, heuristic=EuclideanHeuristic(graph))
+    pruned = run_queries(pathfinder, graph, batch, bounds=bounds)
+    if [r[1] for r in plain[2]] != [r[1] for r in pruned[2]]:
+        raise AssertionError("coin bounds changed an optimal distance")
+    for name, (expansions, seconds, _) in (("euclidean", plain), ("bounds", pruned)):
+        print(f"{name:>10}: {expansions:>9} expansions, {seconds * 1000 / len(batch):8.2f} ms/query")
+
+
+def bench_sweep(size: int = 30, queries: int = 10, max_budget: int = 40, seed: int = 0):
+    """Compare one Pareto-front sweep with a separate A* run per budget"""
+    graph = grid_graph(size, size, seed=seed)
+    rng = random.Random(seed)
+    pairs = [rng.sample(list(graph.cities.values()), 2) for _ in range(queries)]
+    heuristic = EuclideanHeuristic(graph)
+    pathfinder = PathFinder()
+
+    start = time.perf_counter()
+    fronts = [pathfinder.pareto_front(s, t, max_budget, heuristic=heuristic) for s, t in pairs]
+    sweep = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for (s, t), front in zip(pairs, fronts):
+        for budget in range(max_budget + 1):
+            _, distance, _ = pathfinder.a_star_with_coins(s, t, budget, pareto=True, heuristic=heuristic)
+            if distance != front.best_for(budget)[1]:
+                raise AssertionError("Pareto front disagrees with A*")
+    separate = time.perf_counter() - start
+
+    print(f"{len(graph.cities)} cities, {queries} pairs, budgets 0..{max_budget}")
+    print(f"     sweep: {sweep * 1000 / queries:8.2f} ms/pair")
+    print(f"  separate: {separate * 1000 / queries:8.2f} ms/pair ({max_budget + 1} runs each)")
+
+
+def bench_batch(size: int = 40, queries: int = 2000, sources: int = 50, max_budget: int = 20,
+                workers: int = None, seed: int = 0):
+    """Compare a loop of single A* queries with the grouped, parallel batch engine"""
+    graph = grid_graph(size, size, seed=seed).compile()
+    rng = random.Random(seed)
+    starts = rng.sample(list(graph.names), sources)
+    batch = [(rng.choice(starts), rng.choice(graph.names), rng.randint(0, max_budget))
+             for _ in range(queries)]
+    heuristic = EuclideanHeuristic(graph)
+    pathfinder = PathFinder()
+
+    start = time.perf_counter()
+    expected = {query: pathfinder.a_star_compiled(graph, *query, heuristic=heuristic)[1] for query in batch}
+    loop = time.perf_counter() - start
+
+    runner = BatchRunner(graph, workers)
+    for result in runner.run(batch):
+        if result.distance != expected[tuple(result.query)]:
+            raise AssertionError("batch engine disagrees with A*")
+
+    print(f"{graph.num_cities()} cities, {queries} queries from {sources} sources")
+    print(f"      loop: {queries / loop:10.1f} queries/s")
+    print(f"     batch: {runner.stats.queries_per_second():10.1f} queries/s ({runner.stats})")
+
+
+class ListTrace(SearchTrace):
+    """The old always-on tracing: unbounded lists with a linear membership scan"""
+
+    def __init__(self):
+        self.visited = []
+        self.explored = []
+
+    def reset(self):
+        self.visited = []
+        self.explored = []
+
+    def visit(self, city):
+        if city not in self.visited:
+            self.visited.append(city)
+
+    def explore(self, city, neighbor_city):
+        self.explored.append((city, neighbor_city))
+
+
+def bench_tracing(size: int = 40, queries: int = 20, max_budget: int = 60, seed: int = 0):
+    """Time the object-graph A* hot loop with each tracing mode"""
+    graph = grid_graph(size, size, seed=seed)
+    rng = random.Random(seed)
+    batch = [(*rng.sample(list(graph.cities.values()), 2), rng.randint(0, max_budget))
+             for _ in range(queries)]
+    heuristic = EuclideanHeuristic(graph)
+
+    print(f"{len(graph.cities)} cities, {queries} queries")
+    modes = [("off", None), ("ring buffer", RingBufferTrace(1000)),
+             ("callback", CallbackTrace(lambda *event: None)), ("old lists", ListTrace())]
+    for name, trace in modes:
+        pathfinder = PathFinder(trace)
+        start = time.perf_counter()
+        for start_city, goal_city, budget in batch:
+            pathfinder.a_star_with_coins(start_city, goal_city, budget, pareto=True, heuristic=heuristic)
+        seconds = time.perf_counter() - start
+        print(f"{name:>12}: {seconds * 1000 / queries:8.2f} ms/query")
+
+
+def bench_bidirectional(kind: str = "road", nodes: int = 2500, queries: int = 10, seed: int = 0):
+    """Compare one-directional and bidirectional search on long queries"""
+    graph = generate(kind, nodes, seed=seed)
+    rng = random.Random(seed)
+    positions = graph.positions
+    xs = sorted(x for x, _ in positions.values())
+    near = [name for name, (x, _) in positions.items() if x <= xs[len(xs) // 10]]
+    far = [name for name, (x, _) in positions.items() if x >= xs[-len(xs) // 10]]
+    side = round(len(graph.cities) ** 0.5)
+    batch = [(graph.get_city(rng.choice(near)), graph.get_city(rng.choice(far)), 2 * side)
+             for _ in range(queries)]
+
+    print(f"{len(graph.cities)} cities ({kind}), {queries} long queries, budget {2 * side}")
+    pathfinder = PathFinder()
+    runs = [("dijkstra", lambda s, t, b: pathfinder.a_star_with_coins(s, t, b, pareto=True,
+                                                                      heuristic=ZeroHeuristic())),
+            ("euclidean", lambda s, t, b: pathfinder.a_star_with_coins(s, t, b, pareto=True,
+                                                                       heuristic=EuclideanHeuristic(graph))),
+            ("bidirectional", pathfinder.bidirectional_with_coins)]
+    baseline = None
+    for name, search in runs:
+        expansions = 0
+        distances = []
+        start = time.perf_counter()
+        for start_city, goal_city, budget in batch:
+            distances.append(search(start_city, goal_city, budget)[1])
+            expansions += pathfinder.get_expansions()
+        seconds = time.perf_counter() - start
+        if baseline is None:
+            baseline = distances
+        elif distances != baseline:
+            raise AssertionError(f"{name} changed an optimal distance")
+        print(f"{name:>14}: {expansions:>9} expansions, {seconds * 1000 / queries:8.2f} ms/query")
+
+
+def bench_startup(kind: str = "road", sizes=(1000, 10000, 100000), seed: int = 0):
+    """Time rebuilding a graph against opening its mapped file, up to the first answered query"""
+    with tempfile.TemporaryDirectory() as tmp:
+        for nodes in sizes:
+            graph = generate(kind, nodes, seed=seed)
+            start_name, goal_name = random.Random(seed).sample(list(graph.cities), 2)
+            path = os.path.join(tmp, f"{kind}{nodes}.ccpf")
+
+            start = time.perf_counter()
+            compiled = graph.compile()
+            rebuild = time.perf_counter() - start
+            compiled.save(path)
+            del graph, compiled
+
+            start = time.perf_counter()
+            mapped = CompiledGraph.open(path)
+            opened = time.perf_counter() - start
+            PathFinder().a_star_compiled(mapped, start_name, goal_name, 10)
+            first_query = time.perf_counter() - start - opened
+            mapped.close()
+            print(f"{nodes:>8} cities: compile {rebuild * 1000:9.1f} ms, open {opened * 1000:7.2f} ms, "
+                  f"first query {first_query * 1000:8.1f} ms")
+
+
+def bench_memory(kind: str = "road", nodes: int = 100000, seed: int = 0):
+    """Heap used by a CityGraph and by its CompiledGraph, per city and per road"""
+    tracemalloc.start()
+    graph = generate(kind, nodes, seed=seed)
+    graph_bytes = tracemalloc.get_traced_memory()[0]
+    compiled = graph.compile()
+    tracemalloc.stop()
+    cities = len(graph.cities)
+    roads = compiled.num_roads() // 2
+    print(f"{cities} cities, {roads} roads ({kind})")
+    print(f"   CityGraph: {graph_bytes / 2 ** 20:8.1f} MiB, {graph_bytes / cities:7.1f} bytes/city, "
+          f"{graph_bytes / roads:7.1f} bytes/road (all objects)")
+    print(f"    compiled: {compiled.memory_bytes() / 2 ** 20:8.1f} MiB (arrays only)")
+
+
+def bench_gui(kind: str = "road", nodes: int = 2500, moves: int = 30, seed: int = 0):
+    """Frame time of a move in the game window: retained canvas items vs rebuilding every item"""
+    import tkinter as tk  # only this benchmark needs a display
+    from gui import PathFinderGUI
+
+    graph = generate(kind, nodes, seed=seed)
+    rng = random.Random(seed)
+    start_name, goal_name = rng.sample(graph.get_city_names(), 2)
+    root = tk.Tk()
+    app = PathFinderGUI(root, graph)
+    root.update()
+    app.start_var.set(start_name)
+    app.dest_var.set(goal_name)
+    app.coins_var.set(str(10 ** 9))
+    app.start_game()
+    walk = [app.current_city]
+    for _ in range(moves):
+        walk.append(rng.choice(list(walk[-1].roads)))
+
+    print(f"{len(graph.cities)} cities ({kind}), {moves} moves")
+    for mode in ("rebuild", "retained"):
+        app.user_path = [walk[0]]
+        times = []
+        for city in walk[1:]:
+            app.user_path.append(city)
+            app.current_city = city
+            start = time.perf_counter()
+            if mode == "rebuild":
+                app.viewport = None  # what every move cost before items were retained
+            app.draw_graph()
+            app.draw_user_path()
+            root.update_idletasks()
+            times.append(time.perf_counter() - start)
+        print(f"{mode:>9}: p50 {percentile(times, 0.5) * 1000:8.2f} ms, "
+              f"p99 {percentile(times, 0.99) * 1000:8.2f} ms per move")
+    root.destroy()
+
+
+def bench_contraction(kind: str = "road", nodes: int = 2500, queries: int = 100, max_budget: int = 40,
+                      seed: int = 0):
+    """Constrained contraction hierarchy queries vs A* with coins on the same queries"""
+    graph = generate(kind, nodes, seed=seed)
+    compiled = graph.compile()
+    start = time.perf_counter()
+    hierarchy = ContractionHierarchy.build(compiled)
+    build_seconds = time.perf_counter() - start
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "hierarchy.cch")
+        hierarchy.save(path)
+        file_bytes = os.path.getsize(path)
+        start = time.perf_counter()
+        hierarchy = ContractionHierarchy.load(path, compiled)
+        load_seconds = time.perf_counter() - start
+
+        print(f"{compiled.num_cities()} cities ({kind}): built in {build_seconds:.1f} s, "
+              f"{hierarchy.num_shortcuts()} shortcut labels, {file_bytes / 2 ** 20:.1f} MiB file, "
+              f"loaded in {load_seconds * 1000:.2f} ms")
+        batch = random_queries(list(compiled.names), queries, max_budget, seed)
+        pathfinder = PathFinder()
+        heuristic = EuclideanHeuristic(graph)
+        runs = [("a_star_with_coins", lambda s, t, b: pathfinder.a_star_with_coins(
+                    graph.get_city(s), graph.get_city(t), b, pareto=True, heuristic=heuristic)[1:],
+                 pathfinder.get_expansions),
+                ("a_star_compiled", lambda s, t, b: pathfinder.a_star_compiled(
+                    compiled, s, t, b, heuristic=heuristic)[1:], pathfinder.get_expansions),
+                ("contraction", lambda s, t, b: hierarchy.route(s, t, b)[1:],
+                 lambda: hierarchy.expansions)]
+        baseline = None
+        for name, search, expansions_of in runs:
+            times = []
+            expansions = 0
+            answers = []
+            for start_name, goal_name, budget in batch:
+                start = time.perf_counter()
+                answers.append(search(start_name, goal_name, budget)[0])
+                times.append(time.perf_counter() - start)
+                expansions += expansions_of()
+            if baseline is None:
+                baseline = answers
+            elif any(a != b and abs(a - b) > 1e-9 for a, b in zip(answers, baseline) if None not in (a, b)) \
+                    or [a is None for a in answers] != [b is None for b in baseline]:
+                raise AssertionError(f"{name} changed an optimal distance")
+            print(f"{name:>18}: {expansions / queries:9.1f} expansions/query, "
+                  f"p50 {percentile(times, 0.5) * 1000:8.3f} ms, p99 {percentile(times, 0.99) * 1000:8.3f} ms")
+        hierarchy.close()
+
+
+def bench_resources(kind: str = "road", nodes: int = 2500, queries: int = 50, dimensions=(1, 3),
+                    seed: int = 0):
+    """
+    A* with coins vs a_star_with_resources with extra resource dimensions.
+    Zero-cost extras keep the fronts of the coin-only search, so they show
+    the per-label price of a wider vector; random extras show the real cost
+    of a trade-off in every dimension.
+    """
+    graph = generate(kind, nodes, seed=seed)
+    side = round(len(graph.cities) ** 0.5)
+    batch = random_queries(graph.get_city_names(), queries, 2 * side, seed)
+    print(f"{len(graph.cities)} cities ({kind}), {queries} queries, coin budgets up to {2 * side}")
+    pathfinder = PathFinder()
+
+    def run(name, search):
+        expansions = 0
+        distances = []
+        start = time.perf_counter()
+        for start_name, goal_name, budget in batch:
+            distances.append(search(start_name, goal_name, budget)[1])
+            expansions += pathfinder.get_expansions()
+        seconds = time.perf_counter() - start
+        print(f"{name:>22}: {expansions / queries:9.1f} expansions/query, "
+              f"{seconds * 1000 / queries:8.2f} ms/query, {seconds * 1e6 / max(1, expansions):6.2f} us/expansion")
+        return distances
+
+    heuristic = EuclideanHeuristic(graph)
+    baseline = run("a_star_with_coins", lambda s, t, b: pathfinder.a_star_with_coins(
+        graph.get_city(s), graph.get_city(t), b, pareto=True, heuristic=heuristic))
+    if run("resources (coins)", lambda s, t, b: pathfinder.a_star_with_resources(
+            graph.get_city(s), graph.get_city(t), (b,), heuristic=heuristic)) != baseline:
+        raise AssertionError("the coin-only special case changed an optimal distance")
+
+    for count in dimensions:
+        names = tuple(f"r{i}" for i in range(count))
+        free = with_resources(graph, names, seed=seed, max_amount=0)
+        distances = run(f"+{count} zero-cost", lambda s, t, b: pathfinder.a_star_with_resources(
+            free.get_city(s), free.get_city(t), (b,) + (0,) * count, heuristic=heuristic))
+        if distances != baseline:
+            raise AssertionError("zero-cost resources changed an optimal distance")
+        costly = with_resources(graph, names, seed=seed, max_amount=5)
+        run(f"+{count} random", lambda s, t, b: pathfinder.a_star_with_resources(
+            costly.get_city(s), costly.get_city(t), (b,) + (5 * side,) * count, heuristic=heuristic))
+
+
+def bench_all_pairs(kind: str = "road", nodes: int = 1000, queries: int = 200, workers: int = 0, seed: int = 0):
+    """
+    All-pairs table build time and size, then feasibility checks and searches
+    with the tables as bounds vs per-goal GoalBounds and the Euclidean heuristic
+    """
+    graph = generate(kind, nodes, seed=seed)
+    compiled = graph.compile()
+    side = round(len(graph.cities) ** 0.5)
+    batch = random_queries(list(compiled.names), queries, 2 * side, seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "tables.apt")
+        start = time.perf_counter()
+        tables = AllPairsTables.build(compiled, path, workers=workers)
+        print(f"{compiled.num_cities()} cities ({kind}): built in {time.perf_counter() - start:.1f} s, "
+              f"{os.path.getsize(path) / 2 ** 20:.1f} MiB file")
+
+        start = time.perf_counter()
+        feasible = [tables.feasible(s, t, b) for s, t, b in batch]
+        seconds = time.perf_counter() - start
+        print(f"{'feasible()':>18}: {seconds * 1e6 / queries:9.2f} us/query, "
+              f"{feasible.count(False)} of {queries} queries infeasible")
+
+        pathfinder = PathFinder()
+        runs = [("euclidean", {"heuristic": EuclideanHeuristic(graph)}),
+                ("goal bounds", {"bounds": GoalBounds()}),
+                ("all-pairs bounds", {"bounds": tables})]
+        baseline = None
+        for name, options in runs:
+            expansions, seconds, results = run_queries(pathfinder, compiled, batch, **options)
+            distances = [distance for _, distance, _ in results]
+            if baseline is None:
+                baseline = distances
+            elif distances != baseline:
+                raise AssertionError(f"{name} changed an optimal distance")
+            print(f"{name:>18}: {expansions / queries:9.1f} expansions/query, "
+                  f"{seconds * 1000 / queries:8.3f} ms/query")
+        if [d is not None for d in baseline] != feasible:
+            raise AssertionError("feasible() disagrees with the search")
+        tables.close()
+
+
+def percentile(values, fraction: float):
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+
+def bench_suite(kind: str = "grid", nodes: int = 1000, queries: int = 50, budgets=None,
+                engine: str = "object", correlation: float = 0.0, seed: int = 0, stats_log: str = None):
+    """
+    Time a_star_with_coins (or a_star_compiled) on a generated graph at each budget.
+    By default budgets scale with the side of the map, from tight to loose.
+    Returns a JSON-serialisable dict with per-budget expansions, pushes,
+    search counters, peak traced memory and p50/p99 latency.
+    stats_log names a JSON lines file that gets every timed query's SearchStats.
+    """
+    start = time.perf_counter()
+    graph = generate(kind, nodes, seed=seed, correlation=correlation)
+    build_time = time.perf_counter() - start
+    compiled = graph.compile() if engine == "compiled" else None
+    heuristic = EuclideanHeuristic(compiled or graph)
+    if budgets is None:
+        side = round(len(graph.cities) ** 0.5)
+        budgets = [side, 2 * side, 4 * side, 8 * side]
+
+    rng = random.Random(seed)
+    names = graph.get_city_names()
+    pairs = [rng.sample(names, 2) for _ in range(queries)]
+    sink = JsonLinesWriter(stats_log) if stats_log else None
+    pathfinder = PathFinder(stats_sink=sink)
+
+    def search(start_name, goal_name, budget):
+        if compiled is not None:
+            return pathfinder.a_star_compiled(compiled, start_name, goal_name, budget, heuristic=heuristic)
+        return pathfinder.a_star_with_coins(graph.get_city(start_name), graph.get_city(goal_name), budget,
+                                            pareto=True, heuristic=heuristic)
+
+    results = []
+    for budget in budgets:
+        latencies = []
+        expansions = pushes = found = stale_skips = pruned_by_budget = max_heap = 0
+        for start_name, goal_name in pairs:
+            start = time.perf_counter()
+            path, _, _ = search(start_name, goal_name, budget)
+            latencies.append((time.perf_counter() - start) * 1000)
+            stats = pathfinder.get_stats()
+            expansions += stats.expansions
+            pushes += stats.pushes
+            stale_skips += stats.stale_skips
+            pruned_by_budget += stats.pruned_by_budget
+            max_heap = max(max_heap, stats.max_heap)
+            found += path is not None
+
+        # Memory is measured in a second pass so tracing does not skew the timings
+        pathfinder.stats_sink = None
+        peak = 0
+        tracemalloc.start()
+        for start_name, goal_name in pairs:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            search(start_name, goal_name, budget)
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - baseline)
+        tracemalloc.stop()
+        pathfinder.stats_sink = sink
+
+        results.append({
+            'budget': budget,
+            'queries': len(pairs),
+            'found': found,
+            'expansions': expansions,
+            'pushes': pushes,
+            'stale_skips': stale_skips,
+            'pruned_by_budget': pruned_by_budget,
+            'max_heap': max_heap,
+            'peak_memory_bytes': peak,
+            'mean_ms': sum(latencies) / len(latencies),
+            'p50_ms': percentile(latencies, 0.50),
+            'p99_ms': percentile(latencies, 0.99),
+        })
+    if sink is not None:
+        sink.close()
+
+    return {
+        'meta': {
+            'kind': kind,
+            'nodes': len(graph.cities),
+            'directed_roads': sum(len(city.roads) for city in graph.cities.values()),
+            'engine': engine,
+            'correlation': correlation,
+            'seed': seed,
+            'build_seconds': build_time,
+            'python': platform.python_version(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+
+
+def compare_runs(old, new, tolerance: float = 0.10):
+    """
+    Compare two bench_suite results budget by budget.
+    Returns a list of regression messages for p50/p99 latency, expansions or
+    pushes that grew by more than tolerance.
+    """
+    regressions = []
+    old_by_budget = {row['budget']: row for row in old['results']}
+    for row in new['results']:
+        before = old_by_budget.get(row['budget'])
+        if before is None:
+            continue
+        for metric in ('p50_ms', 'p99_ms', 'expansions', 'pushes'):
+            if before[metric] > 0 and row[metric] > before[metric] * (1 + tolerance):
+                regressions.append(f"budget {row['budget']}: {metric} {before[metric]:.3f} -> {row[metric]:.3f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PathFinder benchmarks")
+    sub = parser.add_subparsers(dest="bench", required=True)
+    alt = sub.add_parser("alt", help="ALT landmarks vs stored and Euclidean heuristics")
+    alt.add_argument("--size", type=int, default=100, help="grid side length")
+    alt.add_argument("--queries", type=int, default=50)
+    alt.add_argument("--landmarks", type=int, default=8)
+    tight = sub.add_parser("bounds", help="coin lower-bound pruning on tight budgets")
+    tight.add_argument("--size", type=int, default=60, help="grid side length")
+    tight.add_argument("--queries", type=int, default=30)
+    tight.add_argument("--slack", type=int, default=2, help="coins above the cheapest route")
+    sweep = sub.add_parser("sweep", help="one Pareto-front sweep vs one A* run per budget")
+    sweep.add_argument("--size", type=int, default=30, help="grid side length")
+    sweep.add_argument("--queries", type=int, default=10)
+    sweep.add_argument("--max-budget", type=int, default=40)
+    many = sub.add_parser("batch", help="grouped process-pool batch engine vs a query loop")
+    many.add_argument("--size", type=int, default=40, help="grid side length")
+    many.add_argument("--queries", type=int, default=2000)
+    many.add_argument("--sources", type=int, default=50)
+    many.add_argument("--workers", type=int, default=None)
+    traced = sub.add_parser("tracing", help="A* hot loop with tracing off, ring buffer, callback")
+    traced.add_argument("--size", type=int, default=40, help="grid side length")
+    traced.add_argument("--queries", type=int, default=20)
+    bidir = sub.add_parser("bidir", help="one-directional vs bidirectional search on long queries")
+    bidir.add_argument("--kind", choices=["grid", "geometric", "road"], default="road")
+    bidir.add_argument("--nodes", type=int, default=2500)
+    bidir.add_argument("--queries", type=int, default=10)
+    startup = sub.add_parser("startup", help="compiling a graph vs opening its memory-mapped file")
+    startup.add_argument("--kind", choices=["grid", "geometric", "road"], default="road")
+    startup.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    frames = sub.add_parser("gui", help="game window frame time per move (needs a display)")
+    frames.add_argument("--kind", choices=["grid", "geometric", "road"], default="road")
+    frames.add_argument("--nodes", type=int, default=2500)
+    frames.add_argument("--moves", type=int, default=30)
+    contract = sub.add_parser("contraction", help="constrained contraction hierarchy vs A* with coins")
+    contract.add_argument("--kind", choices=["grid", "geometric", "road", "random"], default="road")
+    contract.add_argument("--nodes", type=int, default=2500)
+    contract.add_argument("--queries", type=int, default=100)
+    contract.add_argument("--max-budget", type=int, default=40)
+    vectors = sub.add_parser("resources", help="coin-only search vs extra resource dimensions")
+    vectors.add_argument("--kind", choices=["grid", "geometric", "road"], default="road")
+    vectors.add_argument("--nodes", type=int, default=2500)
+    vectors.add_argument("--queries", type=int, default=50)
+    vectors.add_argument("--dimensions", type=int, nargs="+", default=[1, 3],
+                         help="extra resources besides coins")
+    pairs = sub.add_parser("allpairs", help="all-pairs distance/coin tables as bounds and feasibility checks")
+    pairs.add_argument("--kind", choices=["grid", "geometric", "road"], default="road")
+    pairs.add_argument("--nodes", type=int, default=1000)
+    pairs.add_argument("--queries", type=int, default=200)
+    pairs.add_argument("--workers", type=int, default=0, help="build processes, 0 to build in this one")
+    memory = sub.add_parser("memory", help="heap used by CityGraph and CompiledGraph")
+    memory.add_argument("--kind", choices=["grid", "geometric", "road"], default="road")
+    memory.add_argument("--nodes", type=int, default=100000)
+    suite = sub.add_parser("suite", help="scaling benchmark on generated graphs, written as JSON")
+    suite.add_argument("--kind", choices=["grid", "geometric", "road"], default="grid")
+    suite.add_argument("--nodes", type=int, default=1000, help="about 1e3 to 1e6 cities")
+    suite.add_argument("--queries", type=int, default=50)
+    suite.add_argument("--budgets", type=int, nargs="+", help="default: 1, 2, 4 and 8 times the map side")
+    suite.add_argument("--engine", choices=["object", "compiled"], default="object")
+    suite.add_argument("--correlation", type=float, default=0.0,
+                       help="distance/coin correlation from -1 to 1")
+    suite.add_argument("--seed", type=int, default=0)
+    suite.add_argument("--output", help="JSON file to write the results to")
+    suite.add_argument("--stats-log", help="JSON lines file to append every query's search stats to")
+    compare = sub.add_parser("compare", help="flag regressions between two suite JSON files")
+    compare.add_argument("old")
+    compare.add_argument("new")
+    compare.add_argument("--tolerance", type=float, default=0.10)
+    args = parser.parse_args()
+
+    if args.bench == "alt":
+        bench_landmarks(args.size, args.queries, args.landmarks)
+    elif args.bench == "bounds":
+        bench_bounds(args.size, args.queries, args.slack)
+    elif args.bench == "sweep":
+        bench_sweep(args.size, args.queries, args.max_budget)
+    elif args.bench == "batch":
+        bench_batch(args.size, args.queries, args.sources, workers=args.workers)
+    elif args.bench == "tracing":
+        bench_tracing(args.size, args.queries)
+    elif args.bench == "bidir":
+        bench_bidirectional(args.kind, args.nodes, args.queries)
+    elif args.bench == "startup":
+        bench_startup(args.kind, args.sizes)
+    elif args.bench == "gui":
+        bench_gui(args.kind, args.nodes, args.moves)
+    elif args.bench == "contraction":
+        bench_contraction(args.kind, args.nodes, args.queries, args.max_budget)
+    elif args.bench == "resources":
+        bench_resources(args.kind, args.nodes, args.queries, args.dimensions)
+    elif args.bench == "allpairs":
+        bench_all_pairs(args.kind, args.nodes, args.queries, args.workers)
+    elif args.bench == "memory":
+        bench_memory(args.kind, args.nodes)
+    elif args.bench == "suite":
+        run = bench_suite(args.kind, args.nodes, args.queries, args.budgets, args.engine,
+                          args.correlation, args.seed, args.stats_log)
+        text = json.dumps(run, indent=2)
+        if args.output:
+            with open(args.output, 'w') as f:
+                f.write(text + "\n")
+        print(text)
+    elif args.bench == "compare":
+        with open(args.old) as f:
+            old = json.load(f)
+        with open(args.new) as f:
+            new = json.load(f)
+        regressions = compare_runs(old, new, args.tolerance)
+        for message in regressions:
+            print(message)
+        if regressions:
+            sys.exit(1)
+        print("No regressions.")
+
+
+if __name__ == "__main__":
+    main()
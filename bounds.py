@@ -0,0 +1,72 @@
+import heapq
+import math
+from collections import OrderedDict
+from operator import attrgetter
+
+
+def city_dijkstra(source_city, key: str):
+    """
+    Cheapest cost from source_city to every reachable City, where the cost of
+    a road is its key attribute ('distance' or 'coins'). Roads are undirected,
+    so this is also the cheapest cost from every city back to source_city.
+    Returns a dict mapping City to cost.
+    """
+    cost_of = attrgetter(key)
+    cost = {source_city: 0}
+    counter = 0
+    pq = [(0, counter, source_city)]
+    while pq:
+        c, _, city = heapq.heappop(pq)
+        if c > cost[city]:
+            continue
+        for neighbor, road in city.roads.items():
+            new_cost = c + cost_of(road)
+            if new_cost < cost.get(neighbor, math.inf):
+                cost[neighbor] = new_cost
+                counter += 1
+                heapq.heappush(pq, (new_cost, counter, neighbor))
+    return cost
+
+
+class GoalBounds:
+    """
+    Per-goal lower bounds for coin-constrained search: the minimum distance and
+    the minimum coins from every city to the goal, each from one reverse Dijkstra.
+    A label whose coins plus min-coins-to-goal exceed the budget can never
+    finish, and min-distance-to-goal is the tightest admissible heuristic.
+    Results are cached for the most recently used goals. Pass the CityGraph
+    to drop them automatically when its version changes, otherwise call
+    clear() after changing the graph.
+    """
+
+    def __init__(self, max_goals: int = 64, graph=None):
+        self.max_goals = max_goals
+        self.graph = graph
+        self.version = graph.version if graph is not None else None
+        self.cache = OrderedDict()
+
+    def _lookup(self, key, compute):
+        if self.graph is not None and self.graph.version != self.version:
+            self.cache.clear()
+            self.version = self.graph.version
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            return self.cache[key]
+        bounds = compute()
+        self.cache[key] = bounds
+        if len(self.cache) > self.max_goals:
+            self.cache.popitem(last=False)
+        return bounds
+
+    def for_goal(self, goal_city):
+        """Return (min_distance, min_coins) dicts mapping City to its bound"""
+        return self._lookup(goal_city, lambda: (city_dijkstra(goal_city, 'distance'),
+                                                city_dijkstra(goal_city, 'coins')))
+
+    def for_goal_id(self, graph, goal_id: int):
+        """Return (min_distance, min_coins) arrays indexed by CompiledGraph city id"""
+        return self._lookup((graph, goal_id), lambda: (graph.dijkstra(goal_id),
+                                                       graph.dijkstra(goal_id, graph.coins)))
+
+    def clear(self):
+        self.cache.clear()
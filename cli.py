@@ -0,0 +1,160 @@
+import argparse
+import json
+import sys
+from compiled_graph import CompiledGraph
+from heuristics import StoredHeuristic, ZeroHeuristic, EuclideanHeuristic
+from pathfinder import PathFinder
+
+# Headless entry point: `python3 -m pathfinder GRAPH START GOAL BUDGET`, or
+# queries from a file or stdin with --batch. Only the search modules are
+# imported here, never tkinter or gui.py, so servers and batch jobs start fast.
+
+HEURISTICS = {"euclidean": EuclideanHeuristic, "zero": lambda graph: ZeroHeuristic(),
+              "stored": lambda graph: StoredHeuristic()}
+
+
+def parse_query(line: str):
+    """
+    A batch line is either "START GOAL BUDGET" or JSON: an object with start,
+    goal and budget keys or a [start, goal, budget] list (for names with spaces).
+    Returns (start, goal, budget), or None for blank lines and # comments.
+    """
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    if line[0] in "{[":
+        query = json.loads(line)
+        if isinstance(query, dict):
+            return query["start"], query["goal"], int(query["budget"])
+        start, goal, budget = query
+        return start, goal, int(budget)
+    start, goal, budget = line.split()
+    return start, goal, int(budget)
+
+
+def read_queries(lines):
+    """Yield parsed queries, or (None, error message) for lines that do not parse"""
+    for number, line in enumerate(lines, 1):
+        try:
+            query = parse_query(line)
+        except (ValueError, KeyError, TypeError) as e:
+            yield None, f"line {number}: cannot parse query ({e})"
+            continue
+        if query is not None:
+            yield query, None
+
+
+def result_record(start, goal, budget, path, distance, coins):
+    if isinstance(distance, float) and distance.is_integer():
+        distance = int(distance)  # compiled graphs store distances as doubles
+    return {"start": start, "goal": goal, "budget": budget, "found": path is not None,
+            "path": path, "distance": distance, "coins": coins}
+
+
+class QueryRunner:
+    """Answers (start, goal, budget) queries on a mapped graph, one JSON-ready record each"""
+
+    def __init__(self, graph, heuristic: str = "euclidean", tables=None, stats: bool = False):
+        self.graph = graph
+        self.pathfinder = PathFinder()
+        self.heuristic = HEURISTICS[heuristic](graph)
+        self.tables = tables  # Optional AllPairsTables used as bounds
+        self.stats = stats
+
+    def run(self, start: str, goal: str, budget: int):
+        for name in (start, goal):
+            if name not in self.graph.index:
+                return {"start": start, "goal": goal, "budget": budget, "error": f"Unknown city {name}."}
+        if self.tables is not None:
+            answer = self.pathfinder.a_star_compiled(self.graph, start, goal, budget, bounds=self.tables)
+        else:
+            answer = self.pathfinder.a_star_compiled(self.graph, start, goal, budget, heuristic=self.heuristic)
+        record = result_record(start, goal, budget, *answer)
+        if self.stats:
+            record["stats"] = self.pathfinder.get_stats().to_dict()
+        return record
+
+
+def run_grouped(graph, queries, workers):
+    """Answer a whole batch with the BatchRunner (grouped by start, results as they finish)"""
+    from batch import BatchRunner
+    for result in BatchRunner(graph, workers=workers).run(queries):
+        yield result_record(*result.query, result.path, result.distance, result.coins)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python3 -m pathfinder",
+                                     description="Headless coin-constrained route queries on a graph file "
+                                                 "written by loaders.py; prints one JSON object per query")
+    parser.add_argument("graph", help="memory-mapped graph file (see loaders.py)")
+    parser.add_argument("query", nargs="*", metavar="START GOAL BUDGET", help="a single query")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="read one query per line from FILE ('-' for stdin): "
+                             "START GOAL BUDGET, a JSON object or a JSON list")
+    parser.add_argument("--heuristic", choices=sorted(HEURISTICS), help="search estimate (default: euclidean)")
+    parser.add_argument("--tables", metavar="FILE", help="all-pairs tables (all_pairs.py) to use as bounds")
+    parser.add_argument("--stats", action="store_true", help="add each query's search stats")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="answer the batch with the grouped batch engine on this many processes "
+                             "(0 for this process); output is then in completion order, and "
+                             "--heuristic, --tables and --stats do not apply")
+    args = parser.parse_args(argv)
+
+    if bool(args.query) == bool(args.batch) or (args.query and len(args.query) != 3):
+        parser.error("give either START GOAL BUDGET or --batch FILE")
+    if args.workers is not None:
+        if not args.batch:
+            parser.error("--workers only applies to --batch")
+        ignored = [option for option, given in (("--heuristic", args.heuristic), ("--tables", args.tables),
+                                                ("--stats", args.stats)) if given]
+        if ignored:
+            parser.error(f"the batch engine used with --workers does not support {', '.join(ignored)}")
+    try:
+        graph = CompiledGraph.open(args.graph)
+    except (OSError, ValueError) as e:
+        parser.error(f"cannot open graph: {e}")
+    tables = None
+    if args.tables:
+        from all_pairs import AllPairsTables
+        tables = AllPairsTables.load(args.tables, graph)
+    runner = QueryRunner(graph, args.heuristic or "euclidean", tables, args.stats)
+
+    if args.query:
+        start, goal, budget = args.query
+        try:
+            budget = int(budget)
+        except ValueError:
+            parser.error(f"budget must be an integer, not {budget}")
+        record = runner.run(start, goal, budget)
+        print(json.dumps(record))
+        return 1 if "error" in record else 0
+
+    source = sys.stdin if args.batch == "-" else open(args.batch)
+    failed = False
+    try:
+        queries = read_queries(source)
+        if args.workers is not None:
+            parsed = []
+            for query, error in queries:
+                if error is not None:
+                    failed = True
+                    print(json.dumps({"error": error}))
+                elif query[0] not in graph.index or query[1] not in graph.index:
+                    failed = True
+                    print(json.dumps(runner.run(*query)))
+                else:
+                    parsed.append(query)
+            records = run_grouped(graph, parsed, args.workers)
+        else:
+            records = ({"error": error} if error is not None else runner.run(*query) for query, error in queries)
+        for record in records:
+            failed = failed or "error" in record
+            print(json.dumps(record), flush=args.batch == "-")
+    finally:
+        if source is not sys.stdin:
+            source.close()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,353 @@
+import heapq
+import math
+import mmap
+import struct
+import sys
+from array import array
+
+# Mapped graph file layout, little-endian, every section 8-byte aligned:
+#   header: magic, format version, reserved, cities n, directed roads m,
+#           min_distance_per_unit
+#   offsets (int64, n + 1), targets (int32, m), distances (float64, m),
+#   coins (int32, m), xs, ys, heuristics (float64, n each),
+#   name offsets (int64, n + 1), city ids sorted by name (int32, n),
+#   then the UTF-8 names back to back
+MAGIC = b"CCPFCSR1"
+VERSION = 1
+HEADER = struct.Struct("<8sIIqqd")
+
+# The CompiledGraph each worker process of a graph_pool searches, set once on start
+_worker_graph = None
+
+
+def _init_worker(graph):
+    global _worker_graph
+    _worker_graph = graph
+
+
+def graph_pool(graph, workers: int = None):
+    """
+    Process pool whose workers each receive graph once (a mapped graph only
+    as its path); submit with_worker_graph calls to it. workers=None starts
+    one per CPU.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(graph,))
+
+
+def with_worker_graph(function, *args):
+    """Run function(graph, *args) in a graph_pool worker on the graph it was given"""
+    return function(_worker_graph, *args)
+
+
+class CompiledGraph:
+    """
+    Read-only snapshot of a CityGraph in compressed sparse row (CSR) form.
+    Cities become integer ids 0..n-1 and the roads leaving city i are the
+    entries offsets[i] .. offsets[i+1]-1 of the targets/distances/coins arrays.
+    """
+
+    def __init__(self, names, xs, ys, heuristics, offsets, targets, distances, coins,
+                 min_distance_per_unit=math.inf):
+        self.names = names  # Maps city id to city name
+        self.xs = xs
+        self.ys = ys
+        self.heuristics = heuristics
+        self.offsets = offsets
+        self.targets = targets
+        self.distances = distances
+        self.coins = coins
+        self.min_distance_per_unit = min_distance_per_unit
+        self.index = {name: i for i, name in enumerate(names)}  # Maps city name to city id
+        self._mmap = None
+        self._path = None
+
+    def __getstate__(self):
+        # A mapped graph is shipped as its path and mapped again on the other side;
+        # otherwise the name index is rebuilt on unpickling rather than shipped
+        if self._path is not None:
+            return {'_path': self._path}
+        state = self.__dict__.copy()
+        del state['index']
+        del state['_mmap']
+        return state
+
+    def __setstate__(self, state):
+        if '_path' in state and len(state) == 1:
+            self.__dict__.update(CompiledGraph.open(state['_path']).__dict__)
+            return
+        self.__dict__.update(state)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self._mmap = None
+
+    @classmethod
+    def from_city_graph(cls, graph):
+        """Freeze a CityGraph into contiguous arrays"""
+        names = list(graph.cities.keys())
+        index = {name: i for i, name in enumerate(names)}
+
+        xs = array('d')
+        ys = array('d')
+        heuristics = array('d')
+        offsets = array('q', [0])
+        targets = array('i')
+        distances = array('d')
+        coins = array('i')
+
+        for name in names:
+            city = graph.cities[name]
+            x, y = graph.positions[name]
+            xs.append(x)
+            ys.append(y)
+            heuristics.append(city.get_heuristic())
+
+            for neighbor, road in city.roads.items():
+                targets.append(index[neighbor.cityName])
+                distances.append(road.distance)
+                coins.append(road.coins)
+            offsets.append(len(targets))
+
+        return cls(names, xs, ys, heuristics, offsets, targets, distances, coins,
+                   graph.min_distance_per_unit)
+
+    @classmethod
+    def from_edges(cls, names, xs, ys, heuristics, sources, targets, distances, coins):
+        """
+        Build the CSR arrays straight from undirected road arrays (sources[k],
+        targets[k], distances[k], coins[k]) without creating City objects.
+        Each road is stored in both directions by a counting sort on city id.
+        """
+        n = len(names)
+        offsets = array('q', [0]) * (n + 1)
+        for u in sources:
+            offsets[u + 1] += 1
+        for v in targets:
+            offsets[v + 1] += 1
+        for i in range(n):
+            offsets[i + 1] += offsets[i]
+
+        m = 2 * len(sources)
+        cursor = array('q', offsets[:n])
+        csr_targets = array('i', [0]) * m
+        csr_distances = array('d', [0.0]) * m
+        csr_coins = array('i', [0]) * m
+        min_ratio = math.inf
+        hypot = math.hypot
+        for k in range(len(sources)):
+            u = sources[k]
+            v = targets[k]
+            distance = distances[k]
+            for a, b in ((u, v), (v, u)):
+                slot = cursor[a]
+                cursor[a] = slot + 1
+                csr_targets[slot] = b
+                csr_distances[slot] = distance
+                csr_coins[slot] = coins[k]
+            length = hypot(xs[v] - xs[u], ys[v] - ys[u])
+            if length > 0 and distance / length < min_ratio:
+                min_ratio = distance / length
+
+        return cls(names, xs, ys, heuristics, offsets, csr_targets, csr_distances, csr_coins, min_ratio)
+
+    def save(self, path: str):
+        """Write the graph in the versioned file format read by open()"""
+        n = len(self.names)
+        m = len(self.targets)
+        encoded = [name.encode('utf-8') for name in self.names]
+        name_offsets = array('q', [0])
+        for name in encoded:
+            name_offsets.append(name_offsets[-1] + len(name))
+        sorted_ids = array('i', sorted(range(n), key=encoded.__getitem__))
+
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, 0, n, m, self.min_distance_per_unit))
+            sections = ((self.offsets, 'q'), (self.targets, 'i'), (self.distances, 'd'),
+                        (self.coins, 'i'), (self.xs, 'd'), (self.ys, 'd'),
+                        (self.heuristics, 'd'), (name_offsets, 'q'), (sorted_ids, 'i'))
+            for values, typecode in sections:
+                data = array(typecode, values).tobytes()
+                f.write(data)
+                f.write(b"\0" * (-len(data) % 8))
+            f.write(b"".join(encoded))
+
+    @classmethod
+    def open(cls, path: str):
+        """
+        Memory-map a file written by save() without reading it in.
+        The arrays are zero-copy views of the file and city names are
+        decoded on demand, so opening costs the same for any graph size.
+        """
+        if sys.byteorder != 'little':
+            raise ValueError("Mapped graph files can only be opened on little-endian machines.")
+        with open(path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, n, m, min_distance_per_unit = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC:
+            mm.close()
+            raise ValueError(f"{path} is not a mapped graph file.")
+        if version != VERSION:
+            mm.close()
+            raise ValueError(f"{path} has format version {version}, expected {VERSION}.")
+
+        view = memoryview(mm)
+        start = HEADER.size
+        sections = []
+        for typecode, count in (('q', n + 1), ('i', m), ('d', m), ('i', m), ('d', n),
+                                ('d', n), ('d', n), ('q', n + 1), ('i', n)):
+            size = struct.calcsize(typecode) * count
+            sections.append(view[start:start + size].cast(typecode))
+            start += size + (-size % 8)
+        offsets, targets, distances, coins, xs, ys, heuristics, name_offsets, sorted_ids = sections
+        blob = view[start:start + name_offsets[n]]
+
+        graph = cls.__new__(cls)
+        graph.names = _NameTable(blob, name_offsets)
+        graph.xs = xs
+        graph.ys = ys
+        graph.heuristics = heuristics
+        graph.offsets = offsets
+        graph.targets = targets
+        graph.distances = distances
+        graph.coins = coins
+        graph.min_distance_per_unit = min_distance_per_unit
+        graph.index = _NameIndex(graph.names, sorted_ids)
+        graph._mmap = mm
+        graph._path = path
+        graph._views = sections + [blob, view]
+        return graph
+
+    def close(self):
+        """Release the memory map of a graph opened with open()"""
+        if self._mmap is not None:
+            for view in self._views:
+                view.release()
+            self._mmap.close()
+            self._mmap = None
+
+    def to_city_graph(self):
+        """Rebuild a mutable CityGraph (creates one City object per city)"""
+        from graph import CityGraph
+        graph = CityGraph()
+        graph.add_cities(zip(self.names, self.heuristics, self.xs, self.ys))
+        names = self.names
+        offsets = self.offsets
+        targets = self.targets
+        distances = self.distances
+        coins = self.coins
+
+        def roads():
+            for u in range(len(names)):
+                for k in range(offsets[u], offsets[u + 1]):
+                    v = targets[k]
+                    if u < v:
+                        yield names[u], names[v], distances[k], coins[k]
+        graph.connect_many(roads())
+        return graph
+
+    def num_cities(self):
+        return len(self.names)
+
+    def num_roads(self):
+        """Number of directed road entries (each undirected road is stored twice)"""
+        return len(self.targets)
+
+    def index_of(self, name: str):
+        """Get the id of a city by name"""
+        return self.index[name]
+
+    def name_of(self, city_id: int):
+        """Get the name of a city by id"""
+        return self.names[city_id]
+
+    def neighbors(self, city_id: int):
+        """Yield (target_id, distance, coins) for every road leaving a city"""
+        for k in range(self.offsets[city_id], self.offsets[city_id + 1]):
+            yield self.targets[k], self.distances[k], self.coins[k]
+
+    def dijkstra(self, source: int, weights=None):
+        """
+        Single-source shortest costs from source using the given per-road
+        weights (the distances array by default). Roads are undirected, so this
+        is also the cost from every city to source.
+        Returns an array of costs with math.inf for unreachable cities.
+        """
+        if weights is None:
+            weights = self.distances
+        offsets = self.offsets
+        targets = self.targets
+        cost = array('d', [math.inf]) * len(self.names)
+        cost[source] = 0.0
+        pq = [(0.0, source)]
+        while pq:
+            c, u = heapq.heappop(pq)
+            if c > cost[u]:
+                continue
+            for k in range(offsets[u], offsets[u + 1]):
+                v = targets[k]
+                new_cost = c + weights[k]
+                if new_cost < cost[v]:
+                    cost[v] = new_cost
+                    heapq.heappush(pq, (new_cost, v))
+        return cost
+
+    def memory_bytes(self):
+        """Approximate size of the array storage in bytes"""
+        arrays = (self.xs, self.ys, self.heuristics, self.offsets,
+                  self.targets, self.distances, self.coins)
+        return sum(a.itemsize * len(a) for a in arrays)
+
+
+class _NameTable:
+    """Read-only sequence of city names decoded on demand from a mapped file"""
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, city_id):
+        if city_id < 0:
+            city_id += len(self)
+        if not 0 <= city_id < len(self):
+            raise IndexError(city_id)
+        return str(self.blob[self.offsets[city_id]:self.offsets[city_id + 1]], 'utf-8')
+
+    def raw(self, city_id: int):
+        return bytes(self.blob[self.offsets[city_id]:self.offsets[city_id + 1]])
+
+
+class _NameIndex:
+    """Name to city id lookup by binary search over ids sorted by name"""
+
+    def __init__(self, names, sorted_ids):
+        self.names = names
+        self.sorted_ids = sorted_ids
+
+    def get(self, name: str, default=None):
+        key = name.encode('utf-8')
+        low, high = 0, len(self.sorted_ids)
+        while low < high:
+            mid = (low + high) // 2
+            if self.names.raw(self.sorted_ids[mid]) < key:
+                low = mid + 1
+            else:
+                high = mid
+        if low < len(self.sorted_ids):
+            city_id = self.sorted_ids[low]
+            if self.names.raw(city_id) == key:
+                return city_id
+        return default
+
+    def __getitem__(self, name: str):
+        city_id = self.get(name)
+        if city_id is None:
+            raise KeyError(name)
+        return city_id
+
+    def __contains__(self, name: str):
+        return self.get(name) is not None
+
+    def __len__(self):
+        return len(self.sorted_ids)
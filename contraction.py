@@ -0,0 +1,364 @@
+import heapq
+import math
+import mmap
+import struct
+from array import array
+from bisect import bisect_right
+from compiled_graph import CompiledGraph
+from pathfinder import _insert_label, _has_label
+
+# File layout: header, then 8-byte aligned sections
+#   up offsets (int64, n + 1), up targets (int32, e),
+#   label offsets (int64, e + 1), label coins (int32, l),
+#   label distances (float64, l), label middles (int32, l; -1 for original roads)
+MAGIC = b"CCPFCCH1"
+HEADER = struct.Struct("<8sIIqqqq")  # magic, version, cities, directed roads, up edges, labels, coin cap
+VERSION = 1
+
+
+def _witness_front(adj, source, skip, max_distance, max_coins, limit):
+    """
+    Bounded multi-criteria search from source that never enters skip.
+    Returns the Pareto front of (coins, distance) found at every city
+    within the bounds, settling at most limit labels.
+    """
+    fronts = {source: [(0, 0)]}
+    pq = [(0, 0, source)]
+    settled = 0
+    while pq and settled < limit:
+        distance, coins, city = heapq.heappop(pq)
+        if not _has_label(fronts[city], distance, coins):
+            continue
+        settled += 1
+        for neighbor, labels in adj[city].items():
+            if neighbor == skip:
+                continue
+            front = None
+            for road_coins, road_distance in labels:
+                new_coins = coins + road_coins
+                if new_coins > max_coins:
+                    break  # labels are sorted by coins
+                new_distance = distance + road_distance
+                if new_distance > max_distance:
+                    continue
+                if front is None:
+                    front = fronts.setdefault(neighbor, [])
+                if _insert_label(front, new_distance, new_coins)[0]:
+                    heapq.heappush(pq, (new_distance, new_coins, neighbor))
+    return fronts
+
+
+def _witnessed(front, distance, coins):
+    """True if some (coins', distance') on front has coins' <= coins and distance' <= distance"""
+    i = bisect_right(front, (coins, math.inf))
+    return i > 0 and front[i - 1][1] <= distance
+
+
+class ContractionHierarchy:
+    """
+    Constrained contraction hierarchy over a CompiledGraph.
+    Cities are contracted one by one in order of importance; when a city is
+    removed, every (distance, coins) trade-off through it that no other route
+    matches is kept as a shortcut label between its remaining neighbors, so
+    each road or shortcut carries a Pareto set instead of a single weight.
+    A query then only searches upward (toward more important cities) from
+    both ends and joins the two searches, keeping the coin budget.
+    """
+
+    def __init__(self, graph, up_offsets, up_targets, label_offsets, label_coins,
+                 label_distances, label_middles, max_coins=None):
+        self.graph = graph
+        self.up_offsets = up_offsets  # upward edges of city u are up_offsets[u] .. up_offsets[u+1]-1
+        self.up_targets = up_targets
+        self.label_offsets = label_offsets  # labels of edge e are label_offsets[e] .. label_offsets[e+1]-1
+        self.label_coins = label_coins  # sorted by coins ascending within an edge
+        self.label_distances = label_distances
+        self.label_middles = label_middles  # contracted city a shortcut label goes through, -1 for a road
+        self.max_coins = max_coins  # budgets above this were not preprocessed
+        self.expansions = 0
+        self._mmap = None
+
+    @classmethod
+    def build(cls, graph, max_coins: int = None, witness_limit: int = 100):
+        """
+        Contract every city of a CityGraph or CompiledGraph.
+        max_coins caps the labels kept (queries may not exceed it); a cap keeps
+        the Pareto sets small on graphs with many coin trade-offs.
+        witness_limit bounds each witness search; an unfinished search only
+        costs extra shortcuts, never a wrong answer.
+        """
+        if not isinstance(graph, CompiledGraph):
+            graph = graph.compile()
+        n = graph.num_cities()
+        cap = math.inf if max_coins is None else max_coins
+
+        # adj[u][w] is the Pareto front of (coins, distance) between uncontracted u and w,
+        # one list shared by both directions
+        adj = [{} for _ in range(n)]
+        for u in range(n):
+            for w, distance, coins in graph.neighbors(u):
+                if w == u or coins > cap:
+                    continue
+                front = adj[u].get(w)
+                if front is None:
+                    front = adj[u][w] = adj[w][u] = []
+                _insert_label(front, distance, coins)
+
+        middles = {}  # (low id, high id, coins, distance) -> contracted city of a shortcut label
+        up = [None] * n  # up[v]: fronts toward the neighbors v still had when it was contracted
+        depth = [0] * n  # contracted neighbors, spreads contraction evenly over the graph
+
+        def plan(v):
+            """Shortcut labels needed to contract v, as [(u, w, [(coins, distance)])]"""
+            neighbors = list(adj[v].items())
+            shortcuts = []
+            for i, (u, front_u) in enumerate(neighbors):
+                candidates = {}
+                for w, front_w in neighbors[i + 1:]:
+                    front = []
+                    for coins1, distance1 in front_u:
+                        for coins2, distance2 in front_w:
+                            if coins1 + coins2 <= cap:
+                                _insert_label(front, distance1 + distance2, coins1 + coins2)
+                    if front:
+                        candidates[w] = front
+                if not candidates:
+                    continue
+                witness = _witness_front(adj, u, v,
+                                         max(front[0][1] for front in candidates.values()),
+                                         max(front[-1][0] for front in candidates.values()),
+                                         witness_limit)
+                for w, front in candidates.items():
+                    found = witness.get(w, ())
+                    needed = [(coins, distance) for coins, distance in front
+                              if not _witnessed(found, distance, coins)]
+                    if needed:
+                        shortcuts.append((u, w, needed))
+            return shortcuts
+
+        def priority(v, shortcuts):
+            added = sum(len(labels) for _, _, labels in shortcuts)
+            removed = sum(len(front) for front in adj[v].values())
+            return added - removed + depth[v]
+
+        # Queued priorities are estimates: contracting any city can remove a witness
+        # route that another city's plan relied on, so a plan is only trusted when it
+        # is computed right before its city is contracted
+        pq = []
+        for v in range(n):
+            heapq.heappush(pq, (priority(v, plan(v)), v))
+        while pq:
+            _, v = heapq.heappop(pq)
+            # Lazy update: contract v only if it is still the cheapest
+            shortcuts = plan(v)
+            current = priority(v, shortcuts)
+            if pq and current > pq[0][0]:
+                heapq.heappush(pq, (current, v))
+                continue
+
+            for u, w, labels in shortcuts:
+                front = adj[u].get(w)
+                if front is None:
+                    front = adj[u][w] = adj[w][u] = []
+                for coins, distance in labels:
+                    if _insert_label(front, distance, coins)[0]:
+                        middles[(min(u, w), max(u, w), coins, distance)] = v
+            up[v] = adj[v]
+            for u in adj[v]:
+                del adj[u][v]
+                depth[u] += 1
+            adj[v] = {}
+
+        # Freeze the upward graph into flat arrays
+        up_offsets = array('q', [0])
+        up_targets = array('i')
+        label_offsets = array('q', [0])
+        label_coins = array('i')
+        label_distances = array('d')
+        label_middles = array('i')
+        for v in range(n):
+            for w, front in up[v].items():
+                up_targets.append(w)
+                low, high = min(v, w), max(v, w)
+                for coins, distance in front:
+                    label_coins.append(coins)
+                    label_distances.append(distance)
+                    label_middles.append(middles.get((low, high, coins, distance), -1))
+                label_offsets.append(len(label_coins))
+            up_offsets.append(len(up_targets))
+        return cls(graph, up_offsets, up_targets, label_offsets, label_coins,
+                   label_distances, label_middles, max_coins)
+
+    def save(self, path: str):
+        """Write the hierarchy as a compact binary file"""
+        cap = -1 if self.max_coins is None else self.max_coins
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, self.graph.num_cities(), self.graph.num_roads(),
+                                len(self.up_targets), len(self.label_coins), cap))
+            for values, typecode in ((self.up_offsets, 'q'), (self.up_targets, 'i'),
+                                     (self.label_offsets, 'q'), (self.label_coins, 'i'),
+                                     (self.label_distances, 'd'), (self.label_middles, 'i')):
+                data = array(typecode, values).tobytes()
+                f.write(data)
+                f.write(b"\0" * (-len(data) % 8))
+
+    @classmethod
+    def load(cls, path: str, graph):
+        """Memory-map a hierarchy written by save() for the same graph"""
+        with open(path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, num_cities, num_roads, num_edges, num_labels, cap = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC or version != VERSION:
+            mm.close()
+            raise ValueError(f"{path} is not a contraction hierarchy (version {VERSION}).")
+        if num_cities != graph.num_cities() or num_roads != graph.num_roads():
+            mm.close()
+            raise ValueError(f"{path} was built for a different graph.")
+
+        view = memoryview(mm)
+        start = HEADER.size
+        sections = []
+        for typecode, count in (('q', num_cities + 1), ('i', num_edges), ('q', num_edges + 1),
+                                ('i', num_labels), ('d', num_labels), ('i', num_labels)):
+            size = struct.calcsize(typecode) * count
+            sections.append(view[start:start + size].cast(typecode))
+            start += size + (-size % 8)
+        hierarchy = cls(graph, *sections, None if cap < 0 else cap)
+        hierarchy._mmap = mm
+        hierarchy._views = sections
+        return hierarchy
+
+    def close(self):
+        """Release the memory map of a loaded hierarchy"""
+        if self._mmap is not None:
+            for view in self._views:
+                view.release()
+            self._mmap.close()
+            self._mmap = None
+
+    def num_shortcuts(self):
+        """Number of shortcut labels added by contraction"""
+        return sum(1 for middle in self.label_middles if middle != -1)
+
+    def memory_bytes(self):
+        arrays = (self.up_offsets, self.up_targets, self.label_offsets, self.label_coins,
+                  self.label_distances, self.label_middles)
+        return sum(a.itemsize * len(a) for a in arrays)
+
+    def _upward(self, source, max_coins):
+        """
+        Pareto search over upward edges only.
+        Returns ({city: [(coins, distance)]}, {(city, coins, distance): (parent city, coins, distance, label)})
+        """
+        up_offsets = self.up_offsets
+        up_targets = self.up_targets
+        label_offsets = self.label_offsets
+        label_coins = self.label_coins
+        label_distances = self.label_distances
+        fronts = {source: [(0, 0)]}
+        parents = {}
+        pq = [(0, 0, source)]
+        while pq:
+            distance, coins, city = heapq.heappop(pq)
+            if not _has_label(fronts[city], distance, coins):
+                continue
+            self.expansions += 1
+            for e in range(up_offsets[city], up_offsets[city + 1]):
+                neighbor = up_targets[e]
+                front = None
+                for k in range(label_offsets[e], label_offsets[e + 1]):
+                    new_coins = coins + label_coins[k]
+                    if new_coins > max_coins:
+                        break  # labels are sorted by coins
+                    new_distance = distance + label_distances[k]
+                    if front is None:
+                        front = fronts.setdefault(neighbor, [])
+                    if _insert_label(front, new_distance, new_coins)[0]:
+                        parents[(neighbor, new_coins, new_distance)] = (city, coins, distance, k)
+                        heapq.heappush(pq, (new_distance, new_coins, neighbor))
+        return fronts, parents
+
+    def _edge_labels(self, low, high):
+        """Label ids of the upward edge from the lower-ranked city low to high"""
+        for e in range(self.up_offsets[low], self.up_offsets[low + 1]):
+            if self.up_targets[e] == high:
+                return range(self.label_offsets[e], self.label_offsets[e + 1])
+        raise KeyError((low, high))
+
+    def _unpack(self, a, b, label, out):
+        """Append the original cities after a on the road or shortcut a-b carrying label"""
+        label_coins = self.label_coins
+        label_distances = self.label_distances
+        stack = [(a, b, label)]
+        while stack:
+            a, b, label = stack.pop()
+            middle = self.label_middles[label]
+            if middle == -1:
+                out.append(b)
+                continue
+            # The shortcut label is the sum of one label on each side of the contracted middle city
+            coins = label_coins[label]
+            distance = label_distances[label]
+            for first in self._edge_labels(middle, a):
+                second = next((k for k in self._edge_labels(middle, b)
+                               if label_coins[first] + label_coins[k] == coins
+                               and label_distances[first] + label_distances[k] == distance), None)
+                if second is not None:
+                    stack.append((middle, b, second))
+                    stack.append((a, middle, first))
+                    break
+            else:
+                raise KeyError((a, b, coins, distance))
+
+    def query(self, start: int, goal: int, max_coins: int):
+        """
+        Shortest route from start to goal within max_coins on city ids.
+        Returns: (path of city ids, total_distance, coins_used) or (None, None, None)
+        """
+        if self.max_coins is not None and max_coins > self.max_coins:
+            raise ValueError(f"Budget {max_coins} is above the preprocessed cap {self.max_coins}.")
+        self.expansions = 0
+        forward, forward_parents = self._upward(start, max_coins)
+        backward, backward_parents = self._upward(goal, max_coins)
+
+        # Join at every city both searches reached
+        best = None
+        for city, front in forward.items():
+            other = backward.get(city)
+            if other is None:
+                continue
+            for coins, distance in front:
+                i = bisect_right(other, (max_coins - coins, math.inf))
+                if i == 0:
+                    break  # front coins only grow from here
+                back_coins, back_distance = other[i - 1]
+                if best is None or distance + back_distance < best[0]:
+                    best = (distance + back_distance, coins + back_coins, city,
+                            (city, coins, distance), (city, back_coins, back_distance))
+        if best is None:
+            return None, None, None
+
+        total_distance, total_coins, meet, forward_label, backward_label = best
+        hops = []  # (from city, to city, label) along the forward search, meeting city first
+        key = forward_label
+        while key in forward_parents:
+            parent, coins, distance, label = forward_parents[key]
+            hops.append((parent, key[0], label))
+            key = (parent, coins, distance)
+        path = [start]
+        for a, b, label in reversed(hops):
+            self._unpack(a, b, label, path)
+        key = backward_label
+        while key in backward_parents:
+            parent, coins, distance, label = backward_parents[key]
+            self._unpack(key[0], parent, label, path)
+            key = (parent, coins, distance)
+        return path, total_distance, total_coins
+
+    def route(self, start_name: str, goal_name: str, max_coins: int):
+        """query() by city names, returning a path of names like PathFinder.a_star_compiled"""
+        graph = self.graph
+        path, distance, coins = self.query(graph.index_of(start_name), graph.index_of(goal_name), max_coins)
+        if path is None:
+            return None, None, None
+        return [graph.name_of(i) for i in path], distance, coins
@@ -0,0 +1,192 @@
+import math
+import random
+from graph import CityGraph
+
+
+def _coins_for(rng, distance, min_distance, max_distance, max_coins, correlation):
+    """
+    Coin cost for a road, correlated with its distance.
+    correlation 1 makes longer roads dearer, -1 makes shorter roads dearer
+    (the interesting trade-off), 0 makes coins independent of distance.
+    """
+    span = max_distance - min_distance
+    u = (distance - min_distance) / span if span > 0 else 0.5
+    if correlation < 0:
+        u = 1 - u
+    weight = abs(correlation)
+    return round(max_coins * (weight * u + (1 - weight) * rng.random()))
+
+
+def grid_graph(rows: int, cols: int, spacing: int = 100, seed: int = 0,
+               max_coins: int = 5, correlation: float = 0.0):
+    """
+    Create a rows x cols grid road network for benchmarks.
+    Road distances are the straight-line spacing stretched by up to 50%,
+    coin costs range from 0 to max_coins, and stored heuristics are 0.
+    """
+    rng = random.Random(seed)
+    graph = CityGraph()
+    low, high = spacing, round(spacing * 1.5)
+
+    for r in range(rows):
+        for c in range(cols):
+            graph.add_city(f"{r},{c}", 0, c * spacing, r * spacing)
+
+    for r in range(rows):
+        for c in range(cols):
+            if c + 1 < cols:
+                distance = round(spacing * rng.uniform(1.0, 1.5))
+                graph.connect_cities(f"{r},{c}", f"{r},{c + 1}", distance,
+                                     _coins_for(rng, distance, low, high, max_coins, correlation))
+            if r + 1 < rows:
+                distance = round(spacing * rng.uniform(1.0, 1.5))
+                graph.connect_cities(f"{r},{c}", f"{r + 1},{c}", distance,
+                                     _coins_for(rng, distance, low, high, max_coins, correlation))
+
+    return graph
+
+
+def random_geometric_graph(n: int, degree: float = 6.0, spacing: int = 100, seed: int = 0,
+                           max_coins: int = 5, correlation: float = 0.0):
+    """
+    Scatter n cities uniformly over a square and connect every pair closer
+    than the radius that gives the requested average degree.
+    Road distances are the straight-line length stretched by up to 30%.
+    """
+    rng = random.Random(seed)
+    graph = CityGraph()
+    side = math.sqrt(n) * spacing
+    radius = math.sqrt(degree * side * side / (math.pi * n))
+
+    # Bucket cities into radius-sized cells so only neighbouring cells are compared
+    cells = {}
+    points = []
+    for i in range(n):
+        x, y = rng.uniform(0, side), rng.uniform(0, side)
+        name = f"N{i}"
+        graph.add_city(name, 0, round(x), round(y))
+        x, y = graph.get_position(name)
+        points.append((name, x, y))
+        cells.setdefault((int(x // radius), int(y // radius)), []).append(i)
+
+    for i, (name, x, y) in enumerate(points):
+        cx, cy = int(x // radius), int(y // radius)
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for j in cells.get((cx + dx, cy + dy), ()):
+                    if j <= i:
+                        continue
+                    other, x2, y2 = points[j]
+                    length = math.hypot(x2 - x, y2 - y)
+                    if length > radius:
+                        continue
+                    distance = max(1, round(length * rng.uniform(1.0, 1.3)))
+                    graph.connect_cities(name, other, distance,
+                                         _coins_for(rng, distance, 1, radius * 1.3, max_coins, correlation))
+
+    return graph
+
+
+def random_graph(n: int, degree: float = 4.0, spacing: int = 100, seed: int = 0,
+                 max_distance: int = 100, max_coins: int = 5):
+    """
+    Connected random graph whose road distances ignore the city positions:
+    a random spanning tree plus random extra roads up to the average degree,
+    each with a distance from 1 to max_distance and 0 to max_coins coins.
+    Positions only matter for drawing; cross-checks use these graphs because
+    geometric ones hide bugs that rely on distances agreeing with positions.
+    """
+    rng = random.Random(seed)
+    graph = CityGraph()
+    side = round(math.sqrt(n) * spacing)
+    for i in range(n):
+        graph.add_city(f"c{i}", 0, rng.randint(0, side), rng.randint(0, side))
+
+    pairs = {(rng.randrange(i), i) for i in range(1, n)}
+    target = min(n * (n - 1) // 2, max(len(pairs), round(n * degree / 2)))
+    while len(pairs) < target:
+        a, b = rng.sample(range(n), 2)
+        pairs.add((min(a, b), max(a, b)))
+    for a, b in sorted(pairs):
+        graph.connect_cities(f"c{a}", f"c{b}", rng.randint(1, max_distance), rng.randint(0, max_coins))
+
+    return graph
+
+
+def road_graph(rows: int, cols: int, spacing: int = 100, seed: int = 0, max_coins: int = 5,
+               correlation: float = 0.0, drop: float = 0.15, highway_every: int = 10):
+    """
+    Road-like network: a jittered street grid with a share of streets dropped,
+    plus straight highways every highway_every rows and columns.
+    Highways are short per unit of length but charge tolls of up to
+    3 * max_coins, which makes the distance/coin trade-off matter.
+    """
+    rng = random.Random(seed)
+    graph = CityGraph()
+    jitter = spacing * 0.3
+
+    for r in range(rows):
+        for c in range(cols):
+            graph.add_city(f"{r},{c}", 0,
+                           round(c * spacing + rng.uniform(-jitter, jitter)),
+                           round(r * spacing + rng.uniform(-jitter, jitter)))
+
+    def street(a, b):
+        (x1, y1), (x2, y2) = graph.get_position(a), graph.get_position(b)
+        distance = max(1, round(math.hypot(x2 - x1, y2 - y1) * rng.uniform(1.1, 1.6)))
+        graph.connect_cities(a, b, distance,
+                             _coins_for(rng, distance, spacing * 0.4, spacing * 2.6, max_coins, correlation))
+
+    def highway(a, b):
+        (x1, y1), (x2, y2) = graph.get_position(a), graph.get_position(b)
+        distance = max(1, round(math.hypot(x2 - x1, y2 - y1) * 0.9))
+        graph.connect_cities(a, b, distance, rng.randint(max_coins, 3 * max_coins))
+
+    for r in range(rows):
+        for c in range(cols):
+            if c + 1 < cols and rng.random() >= drop:
+                street(f"{r},{c}", f"{r},{c + 1}")
+            if r + 1 < rows and rng.random() >= drop:
+                street(f"{r},{c}", f"{r + 1},{c}")
+
+    for r in range(0, rows, highway_every):
+        for c in range(0, cols - highway_every, highway_every):
+            highway(f"{r},{c}", f"{r},{c + highway_every}")
+    for c in range(0, cols, highway_every):
+        for r in range(0, rows - highway_every, highway_every):
+            highway(f"{r},{c}", f"{r + highway_every},{c}")
+
+    return graph
+
+
+def generate(kind: str, nodes: int, seed: int = 0, max_coins: int = 5, correlation: float = 0.0):
+    """Build a graph of the given kind ('grid', 'geometric', 'road' or 'random') with about nodes cities"""
+    side = max(2, round(math.sqrt(nodes)))
+    if kind == "grid":
+        return grid_graph(side, side, seed=seed, max_coins=max_coins, correlation=correlation)
+    if kind == "geometric":
+        return random_geometric_graph(nodes, seed=seed, max_coins=max_coins, correlation=correlation)
+    if kind == "road":
+        return road_graph(side, side, seed=seed, max_coins=max_coins, correlation=correlation)
+    if kind == "random":
+        return random_graph(nodes, seed=seed, max_coins=max_coins)
+    raise ValueError(f"Unknown graph kind {kind}.")
+
+
+def with_resources(graph, names, seed: int = 0, max_amount: int = 5):
+    """
+    Copy of graph whose roads also carry the extra resources in names
+    (e.g. ("time", "fuel")), each a random amount from 0 to max_amount.
+    Distances, coins and positions are kept.
+    """
+    rng = random.Random(seed)
+    copy = CityGraph(tuple(names))
+    copy.add_cities((name, city.heuristic, *graph.get_position(name)) for name, city in graph.cities.items())
+    done = set()  # Cities whose roads are already copied
+    for city in graph.cities.values():
+        copy.connect_many((city.cityName, neighbor.cityName, road.distance, road.coins,
+                           *(rng.randint(0, max_amount) for _ in names))
+                          for neighbor, road in city.roads.items()
+                          if neighbor not in done)
+        done.add(city)
+    return copy
@@ -1,31 +1,144 @@
-from nodes import City
+import math
+from nodes import City, Road
+from compiled_graph import CompiledGraph
 
 class CityGraph:
-    def __init__(self):
+    def __init__(self, extra_resources=()):
+        self.resources = ("coins", *extra_resources)  # Budgeted resources every road carries, coins first
         self.cities = {}  # Maps city name to City object
         self.positions = {}  # Maps city name to (x, y) for visualization
+        self.min_distance_per_unit = math.inf  # Smallest road distance per unit of straight-line length
+        self.version = 0  # Bumped on every change so caches can tell they are stale
+        self.listeners = []  # Called as listener(event, *args) after every change
+        self.road_entries = 0  # Directed entries in City.roads (two per road)
     
     def add_city(self, name: str, heuristic: float, x: int, y: int):
         """Add a city to the graph"""
         city = City(name, heuristic)
         self.cities[name] = city
         self.positions[name] = (x, y)
+        self.version += 1
+        self._notify("city", city)
         return city
     
-    def connect_cities(self, city1_name: str, city2_name: str, distance: int, coins: int):
-        """Connect two cities with distance and coin cost"""
+    def connect_cities(self, city1_name: str, city2_name: str, distance: int, coins: int, *extra):
+        """Connect two cities with distance, coin cost and one amount per extra resource"""
         city1 = self.cities[city1_name]
         city2 = self.cities[city2_name]
         
         # Modified connect method to handle distance and coins
+        if city1 is city2:
+            raise ValueError(f"{city1_name} cannot be connected to itself.")
         if city2 in city1.roads:
             raise ValueError(f"{city1_name} already connected to {city2_name}.")
         if city1 in city2.roads:
             raise ValueError(f"{city2_name} already connected to {city1_name}.")
         
-        # Store both distance and coin cost
-        city1.roads[city2] = {'distance': distance, 'coins': coins}
-        city2.roads[city1] = {'distance': distance, 'coins': coins}
+        if distance < 0:
+            raise ValueError(f"Road {city1_name}-{city2_name} has negative distance.")
+        if len(extra) != len(self.resources) - 1:
+            raise ValueError(f"Road {city1_name}-{city2_name} needs amounts for {self.resources[1:]}.")
+        
+        # Store distance and costs in one record shared by both directions
+        road = Road(distance, coins, *extra)
+        city1.roads[city2] = road
+        city2.roads[city1] = road
+        self.road_entries += 2
+        
+        # Keep the Euclidean heuristic admissible for every goal
+        x1, y1 = self.positions[city1_name]
+        x2, y2 = self.positions[city2_name]
+        length = math.hypot(x2 - x1, y2 - y1)
+        if length > 0:
+            self.min_distance_per_unit = min(self.min_distance_per_unit, distance / length)
+        
+        self.version += 1
+        self._notify("road", city1, city2)
+    
+    def add_cities(self, rows):
+        """Bulk add_city for an iterable of (name, heuristic, x, y) rows"""
+        cities = self.cities
+        positions = self.positions
+        added = []
+        for name, heuristic, x, y in rows:
+            city = City(name, heuristic)
+            cities[name] = city
+            positions[name] = (x, y)
+            added.append(city)
+        self.version += 1
+        if self.listeners:
+            for city in added:
+                self._notify("city", city)
+    
+    def connect_many(self, edges, check_duplicates: bool = True):
+        """
+        Bulk connect_cities for an iterable of (city1, city2, distance, coins, *extra) rows.
+        Self-loops are always rejected. With check_duplicates=False the
+        per-road duplicate checks are skipped; call validate_roads() once
+        after the last batch to catch any duplicate that slipped through.
+        A bad row raises ValueError; the rows before it stay connected.
+        """
+        cities = self.cities
+        positions = self.positions
+        hypot = math.hypot
+        min_ratio = self.min_distance_per_unit
+        count = 0
+        extra_count = len(self.resources) - 1
+        try:
+            for city1_name, city2_name, distance, coins, *extra in edges:
+                city1 = cities[city1_name]
+                city2 = cities[city2_name]
+                if city1 is city2:
+                    raise ValueError(f"{city1_name} cannot be connected to itself.")
+                if check_duplicates and (city2 in city1.roads or city1 in city2.roads):
+                    raise ValueError(f"{city1_name} already connected to {city2_name}.")
+                if distance < 0:
+                    raise ValueError(f"Road {city1_name}-{city2_name} has negative distance.")
+                if len(extra) != extra_count:
+                    raise ValueError(f"Road {city1_name}-{city2_name} needs amounts for {self.resources[1:]}.")
+                
+                road = Road(distance, coins, *extra)
+                city1.roads[city2] = road
+                city2.roads[city1] = road
+                count += 1
+                
+                x1, y1 = positions[city1_name]
+                x2, y2 = positions[city2_name]
+                length = hypot(x2 - x1, y2 - y1)
+                if length > 0 and distance / length < min_ratio:
+                    min_ratio = distance / length
+                
+                if self.listeners:
+                    self._notify("road", city1, city2)
+        finally:
+            self.min_distance_per_unit = min_ratio
+            self.road_entries += 2 * count
+            self.version += 1
+    
+    def validate_roads(self):
+        """Raise ValueError on a self-loop, or if City.roads lost entries to duplicate roads"""
+        actual = 0
+        for name, city in self.cities.items():
+            if city in city.roads:
+                raise ValueError(f"{name} is connected to itself.")
+            actual += len(city.roads)
+        if actual != self.road_entries:
+            raise ValueError(f"Graph has {actual} road entries, expected {self.road_entries}: "
+                             f"duplicate roads were loaded without checks.")
+    
+    def add_listener(self, listener):
+        """
+        Register listener(event, *args) to hear about changes:
+        ("city", city) after add_city and ("road", city1, city2) after connect_cities
+        """
+        self.listeners.append(listener)
+    
+    def remove_listener(self, listener):
+        self.listeners.remove(listener)
+    
+    def _notify(self, event, *args):
+        for listener in self.listeners:
+            listener(event, *args)
     
     def get_city(self, name: str):
         """Get a city by name"""
@@ -38,6 +151,18 @@ class CityGraph:
     def get_position(self, city_name: str):
         """Get the (x, y) position of a city"""
         return self.positions.get(city_name)
+    
+    def compile(self):
+        """Freeze the graph into an array-backed CompiledGraph for fast searches"""
+        return CompiledGraph.from_city_graph(self)
+    
+    def precompute_all_pairs(self, path: str, workers: int = 0):
+        """
+        Compile the graph and write its all-pairs distance and coin tables to path.
+        Returns the mapped AllPairsTables, usable as PathFinder bounds.
+        """
+        from all_pairs import AllPairsTables
+        return AllPairsTables.build(self.compile(), path, workers=workers)
 
 
 def create_sample_graph():
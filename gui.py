@@ -1,12 +1,24 @@
+import queue
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
 from pathfinder import PathFinder
+from heuristics import EuclideanHeuristic
+from query_cache import QueryCache
+from replanner import IncrementalPlanner
+from tracing import CallbackTrace, SearchCancelled
+from viewport import Viewport
 
 class PathFinderGUI:
+    FRAME_MS = 30  # delay between batches of search events drawn on the canvas
+    EVENTS_PER_FRAME = 2000  # most search events drawn per batch
+    HINT_POPS_PER_FRAME = 2000  # most route hint search steps run per batch on the Tk thread
+
     def __init__(self, root, graph):
         self.root = root
         self.graph = graph
-        self.pathfinder = PathFinder()
+        self.heuristic = EuclideanHeuristic(graph)  # goal-aware estimate used by the AI
+        self.query_cache = QueryCache(graph, heuristic=self.heuristic)  # only used on the Tk thread
         self.animation_running = False
         
         # Game state
@@ -18,6 +30,18 @@ class PathFinderGUI:
         self.user_distance = 0
         self.user_coins = 0
         self.max_coins = 0
+        self.planner = None  # keeps its search between moves for the route hint
+        self.hint_pending = None  # planner whose unfinished hint search is scheduled
+        self.ai_path = None
+        self.solve = None  # (events queue, cancel flag) of the AI search running in the background
+        self.search_cities = set()  # cities and roads highlighted by the running AI search
+        self.search_roads = set()
+        
+        # Retained canvas scene, filled in by build_scene
+        self.city_items = {}
+        self.road_items = {}
+        self.viewport = None  # screen transform the scene was built with
+        self.resize_pending = None
         
         self.root.title("Coin-Constrained Path Finder - Interactive Game")
         self.root.geometry("1400x900")
@@ -146,6 +170,13 @@ class PathFinderGUI:
                                          command=self.show_ai_solution,
                                          relief=tk.FLAT, padx=15, pady=7, width=20)
         
+        # Cancel AI Button (shown while the AI is searching)
+        self.cancel_btn = tk.Button(buttons_frame, text="Cancel AI Search", 
+                                    font=("Almendra", 20),
+                                    bg="#EBD4CB", fg="#2C0603", 
+                                    command=self.cancel_ai_solution,
+                                    relief=tk.FLAT, padx=15, pady=7, width=20)
+        
         # Reset Button
         self.reset_btn = tk.Button(buttons_frame, text="Reset Game", 
                                    font=("Almendra", 20),
@@ -197,6 +228,7 @@ class PathFinderGUI:
 
         # Bind clicks
         self.canvas.bind("<Button-1>", self.on_city_click)
+        self.canvas.bind("<Configure>", self.on_canvas_resize)
 
         # Draw initial graph
         self.draw_graph()
@@ -212,118 +244,164 @@ class PathFinderGUI:
         self.result_text.see(1.0)
     
     def draw_graph(self):
+        """
+        Bring the canvas up to date with the game state.
+        Canvas items are created once by build_scene and then only restyled;
+        the scene is rebuilt when the canvas is resized or the graph changes.
+        """
+        width, height = self.canvas_size()
+        if self.viewport is None or not self.viewport.is_current(self.graph, width, height):
+            self.build_scene(width, height)
+        self.canvas.delete("user_path", "ai_path", "legend")
+        self.update_city_styles()
+        self.update_heuristic_labels()
+
+    def canvas_size(self):
+        # Before the canvas is mapped its requested size stands in; <Configure> redraws once it is shown
+        width, height = self.canvas.winfo_width(), self.canvas.winfo_height()
+        if width < 10 or height < 10:
+            width, height = self.canvas.winfo_reqwidth(), self.canvas.winfo_reqheight()
+        return width, height
+
+    def build_scene(self, width, height):
+        """Create every road and city item from scratch (resize or graph change only)"""
         self.canvas.delete("all")
+        self.viewport = Viewport(self.graph, width, height)
+        position = self.viewport.position
 
-        xs, ys = [], []
-        for name in self.graph.get_city_names():
-            x, y = self.graph.get_position(name)
-            xs.append(x)
-            ys.append(y)
-
-        min_x, max_x = min(xs), max(xs)
-        min_y, max_y = min(ys), max(ys)
-
-        graph_w = max_x - min_x
-        graph_h = max_y - min_y
-
-        canvas_w = self.canvas.winfo_width()
-        canvas_h = self.canvas.winfo_height()
-        if canvas_w < 10 or canvas_h < 10:
-            self.canvas.update_idletasks()
-            canvas_w = self.canvas.winfo_width()
-            canvas_h = self.canvas.winfo_height()
-
-        margin = 40
-        usable_w = canvas_w - margin * 2
-        usable_h = canvas_h - margin * 2
-        scale_x = usable_w / graph_w if graph_w > 0 else 1
-        scale_y = usable_h / graph_h if graph_h > 0 else 1
-        SCALE = min(scale_x, scale_y)
-
-        scaled_w = graph_w * SCALE
-        scaled_h = graph_h * SCALE
-        offset_x = (canvas_w - scaled_w) // 2 - min_x * SCALE
-        offset_y = (canvas_h - scaled_h) // 2 - min_y * SCALE
-
-
-        # Store scaled positions in the class
-        self.scaled_positions = {}
-        for city_name in self.graph.get_city_names():
-            x, y = self.graph.get_position(city_name)
-            sx = x * SCALE + offset_x
-            sy = y * SCALE + offset_y
-            self.scaled_positions[city_name] = (sx, sy)
-
-
-        # Draw edges
+        # Draw edges, keeping (line, distance label, coins label) per road
+        self.road_items = {}
         for city_name, city in self.graph.cities.items():
-            sx1, sy1 = self.scaled_positions[city_name]
+            sx1, sy1 = position(city_name)
 
             for neighbor, edge_info in city.roads.items():
                 neighbor_name = neighbor.cityName
                 if city_name < neighbor_name:
-                    sx2, sy2 = self.scaled_positions[neighbor_name]
+                    sx2, sy2 = position(neighbor_name)
 
-                    self.canvas.create_line(
+                    line = self.canvas.create_line(
                         sx1, sy1, sx2, sy2,
-                        fill="white", width=2
+                        fill="white", width=2, tags="road"
                     )
 
                     mx = (sx1 + sx2) / 2
                     my = (sy1 + sy2) / 2
 
-                    self.canvas.create_text(
+                    distance_label = self.canvas.create_text(
                         mx, my - 15,
-                        text=f"Distance: {edge_info['distance']}",
+                        text=f"Distance: {edge_info.distance}",
                         fill="#EBD4CB",
-                        font=("Almendra", 15)
+                        font=("Almendra", 15),
+                        tags="road_label"
                     )
-                    self.canvas.create_text(
+                    coins_label = self.canvas.create_text(
                         mx, my + 12,
-                        text=f"Coins: {edge_info['coins']}",
+                        text=f"Coins: {edge_info.coins}",
                         fill="#DAA094",
-                        font=("Almendra", 15, "bold")
+                        font=("Almendra", 15, "bold"),
+                        tags="road_label"
                     )
+                    self.road_items[(city_name, neighbor_name)] = (line, distance_label, coins_label)
 
 
-        # Draw cities
-        for city_name in self.graph.get_city_names():
-            sx, sy = self.scaled_positions[city_name]
-            city = self.graph.get_city(city_name)
-
-            if self.game_mode in ["playing", "finished", "comparing"]:
-                if city == self.current_city:
-                    color = "#890620"; outline = "#2C0703"; text_color = "white"
-                elif city == self.start_city:
-                    color = "#B6465F"; outline = "#890620"; text_color = "white"
-                elif city == self.goal_city:
-                    color = "#2C0703"; outline = "#890620"; text_color = "white"
-                elif city in [self.graph.get_city(c.cityName) for c in self.user_path]:
-                    color = "#DA9F93"; outline = "#B6465F"; text_color = "white"
-                else:
-                    color = "#EBD4CB"; outline = "#DA9F93"; text_color = "#2C0603"
-            else:
-                color = "#B6465F"; outline = "#890620"; text_color = "black"
-
-            R = max(10, 20 * SCALE)
-            self.canvas.create_oval(
+        # Draw cities, keeping (oval, name label, h label) per city; colors and h are set afterwards
+        self.city_items = {}
+        SCALE = self.viewport.scale
+        R = self.viewport.radius
+        for city_name, sx, sy in zip(self.viewport.names, self.viewport.xs, self.viewport.ys):
+            oval = self.canvas.create_oval(
                 sx - R, sy - R, sx + R, sy + R,
-                fill=color, outline=outline, width=3
+                width=3, tags="city"
             )
-            self.canvas.create_text(
+            label = self.canvas.create_text(
                 sx, sy,
                 text=city_name,
-                fill=text_color,
-                font=("Almendra", int(17 * SCALE), "bold")
+                font=("Almendra", int(17 * SCALE), "bold"),
+                tags="city_label"
             )
-
-            heuristic = city.get_heuristic()
-            self.canvas.create_text(
+            h_label = self.canvas.create_text(
                 sx, sy + R + 15,
-                text=f"h={int(heuristic)}",
                 fill="#B6465F",
-                font=("Almendra", int(20 * SCALE), "bold")
+                font=("Almendra", int(20 * SCALE), "bold"),
+                tags="h_label"
             )
+            self.city_items[city_name] = (oval, label, h_label)
+
+        self.city_styles = {}  # city name -> (fill, outline, text color) currently on the canvas
+        self.styled_cities = set()  # cities styled differently from the default
+        self.default_style = None
+        self.h_goal = ()  # goal the h labels were last written for
+        self.search_cities = set()
+        self.search_roads = set()
+
+    def city_style(self, city, on_path):
+        """(fill, outline, text color) of a city in the current game state"""
+        if self.game_mode in ["playing", "finished", "comparing"]:
+            if city == self.current_city:
+                return "#890620", "#2C0703", "white"
+            if city == self.start_city:
+                return "#B6465F", "#890620", "white"
+            if city == self.goal_city:
+                return "#2C0703", "#890620", "white"
+            if city in on_path:
+                return "#DA9F93", "#B6465F", "white"
+            return "#EBD4CB", "#DA9F93", "#2C0603"
+        return "#B6465F", "#890620", "black"
+
+    def update_city_styles(self):
+        """Restyle only the cities whose colors changed since the last update"""
+        on_path = set(self.user_path)
+        marked = on_path | {self.start_city, self.current_city, self.goal_city}
+        marked.discard(None)
+        default = self.city_style(None, ())
+
+        if default != self.default_style:
+            names = self.city_items.keys()  # mode change: every city may change
+            self.default_style = default
+        else:
+            names = {city.cityName for city in marked} | self.styled_cities
+
+        styled = set()
+        for city_name in names:
+            city = self.graph.get_city(city_name)
+            style = self.city_style(city, on_path) if city in marked else default
+            if style != default:
+                styled.add(city_name)
+            if self.city_styles.get(city_name) != style:
+                fill, outline, text_color = style
+                oval, label, _ = self.city_items[city_name]
+                self.canvas.itemconfigure(oval, fill=fill, outline=outline)
+                self.canvas.itemconfigure(label, fill=text_color)
+                self.city_styles[city_name] = style
+        self.styled_cities = styled
+
+    def update_heuristic_labels(self):
+        """Show the estimate toward the chosen goal once there is one (rewritten only when the goal changes)"""
+        if self.h_goal == (self.goal_city,):
+            return
+        self.h_goal = (self.goal_city,)
+        if self.goal_city is not None:
+            h_of = self.heuristic.for_goal(self.goal_city)
+        else:
+            h_of = lambda city: city.get_heuristic()
+        for city_name, (_, _, h_label) in self.city_items.items():
+            heuristic = h_of(self.graph.get_city(city_name))
+            self.canvas.itemconfigure(h_label, text=f"h={int(heuristic)}")
+
+    def on_canvas_resize(self, event):
+        # Coalesce a burst of <Configure> events into one rebuild
+        if self.resize_pending is None:
+            self.resize_pending = self.root.after_idle(self.redraw_after_resize)
+
+    def redraw_after_resize(self):
+        self.resize_pending = None
+        if self.viewport.is_current(self.graph, *self.canvas_size()):
+            return
+        self.draw_graph()
+        if self.game_mode != "setup":
+            self.draw_user_path()
+        if self.game_mode == "comparing" and self.ai_path:
+            self.draw_ai_path()
 
 
     def start_game(self):
@@ -344,7 +422,11 @@ class PathFinderGUI:
             self.user_path = [self.start_city]
             self.user_distance = 0
             self.user_coins = 0
+            self.ai_path = None
             self.game_mode = "playing"
+            if self.planner is not None:
+                self.planner.close()
+            self.planner = IncrementalPlanner(self.graph, self.goal_city, self.max_coins)
             
             # Update UI
             self.start_combo.config(state="disabled")
@@ -369,49 +451,10 @@ class PathFinderGUI:
         
         clicked_city = None
         
-        # Use the same scaling as draw_graph
-        xs, ys = [], []
-        for name in self.graph.get_city_names():
-            x, y = self.graph.get_position(name)
-            xs.append(x)
-            ys.append(y)
-
-        min_x, max_x = min(xs), max(xs)
-        min_y, max_y = min(ys), max(ys)
-
-        graph_w = max_x - min_x
-        graph_h = max_y - min_y
-
-        canvas_w = self.canvas.winfo_width()
-        canvas_h = self.canvas.winfo_height()
-        if canvas_w < 10 or canvas_h < 10:
-            self.canvas.update_idletasks()
-            canvas_w = self.canvas.winfo_width()
-            canvas_h = self.canvas.winfo_height()
-
-        margin = 40
-        usable_w = canvas_w - margin * 2
-        usable_h = canvas_h - margin * 2
-        scale_x = usable_w / graph_w if graph_w > 0 else 1
-        scale_y = usable_h / graph_h if graph_h > 0 else 1
-        SCALE = min(scale_x, scale_y)
-
-        scaled_w = graph_w * SCALE
-        scaled_h = graph_h * SCALE
-        offset_x = (canvas_w - scaled_w) // 2 - min_x * SCALE
-        offset_y = (canvas_h - scaled_h) // 2 - min_y * SCALE
-
-        def T(px, py):
-            return px * SCALE + offset_x, py * SCALE + offset_y
-
-        # Now check clicks against scaled positions
-        for city_name in self.graph.get_city_names():
-            x, y = self.graph.get_position(city_name)
-            sx, sy = T(x, y)
-            R = max(10, 20 * SCALE)
-            if (sx - R <= event.x <= sx + R) and (sy - R <= event.y <= sy + R):
-                clicked_city = self.graph.get_city(city_name)
-                break
+        # Look up the nearest city circle under the click in the viewport's grid
+        city_name = self.viewport.city_at(event.x, event.y)
+        if city_name is not None:
+            clicked_city = self.graph.get_city(city_name)
 
         if clicked_city is None:
             return
@@ -420,20 +463,20 @@ class PathFinderGUI:
         # Check if this city is a valid neighbor
         if clicked_city in self.current_city.roads:
             edge_info = self.current_city.roads[clicked_city]
-            new_coins = self.user_coins + edge_info['coins']
+            new_coins = self.user_coins + edge_info.coins
             
             # Check coin constraint
             if new_coins > self.max_coins:
                 messagebox.showwarning("Insufficient Coins!", 
-                                     f"This route costs {edge_info['coins']} coins.\n"
+                                     f"This route costs {edge_info.coins} coins.\n"
                                      f"You only have {self.max_coins - self.user_coins} coins left!\n\n"
                                      f"Try using 'Undo Last Move' to go back.")
                 return
             
             # Valid move!
             self.user_path.append(clicked_city)
-            self.user_distance += edge_info['distance']
-            self.user_coins += edge_info['coins']
+            self.user_distance += edge_info.distance
+            self.user_coins += edge_info.coins
             self.current_city = clicked_city
             
             self.update_status()
@@ -453,9 +496,9 @@ class PathFinderGUI:
             city1 = self.user_path[i]
             city2 = self.user_path[i + 1]
 
-            # Use scaled positions from draw_graph
-            sx1, sy1 = self.scaled_positions[city1.cityName]
-            sx2, sy2 = self.scaled_positions[city2.cityName]
+            # Use the screen positions from draw_graph
+            sx1, sy1 = self.viewport.position(city1.cityName)
+            sx2, sy2 = self.viewport.position(city2.cityName)
 
             self.canvas.create_line(
                 sx1, sy1, sx2, sy2,
@@ -487,9 +530,34 @@ class PathFinderGUI:
             status_text += "Goal reached!\nClick Submit to compare!"
         else:
             status_text += "Keep building your path..."
+            
+            # Hint: best route from here with the coins left. The first search
+            # can take a while on large maps, so it runs in batches between frames
+            coins_left = self.max_coins - self.user_coins
+            if not self.planner.advance(self.current_city, coins_left, self.HINT_POPS_PER_FRAME):
+                status_text += "\n\nHint: computing…"
+                if self.hint_pending is not self.planner:
+                    self.hint_pending = self.planner
+                    self.root.after(self.FRAME_MS, self.continue_hint, self.planner)
+                self.update_result_text(status_text)
+                return
+            hint_path, hint_distance, hint_coins = self.planner.best_route(self.current_city, coins_left)
+            if hint_path is None:
+                status_text += "\n\nHint: the goal is out of reach\nwith the coins left."
+            else:
+                hint_names = [city.cityName for city in hint_path]
+                status_text += (f"\n\nHint: {' → '.join(hint_names)}\n"
+                               f"({hint_distance} more distance, {hint_coins} coins)")
         
         self.update_result_text(status_text)
     
+    def continue_hint(self, planner):
+        """Run the next batch of the route hint search, and show the hint once it is ready"""
+        if planner is not self.planner:
+            return  # a new game or a reset replaced the planner
+        self.hint_pending = None
+        if self.game_mode == "playing" and self.current_city != self.goal_city:
+            self.update_status()
         
     def undo_move(self):
         # Undo the last move
@@ -511,8 +579,8 @@ class PathFinderGUI:
         self.user_coins = 0
         for i in range(len(self.user_path) - 1):
             edge_info = self.user_path[i].roads[self.user_path[i + 1]]
-            self.user_distance += edge_info['distance']
-            self.user_coins += edge_info['coins']
+            self.user_distance += edge_info.distance
+            self.user_coins += edge_info.coins
         
         self.update_status()
         self.draw_graph()
@@ -552,73 +620,143 @@ class PathFinderGUI:
         self.update_result_text(completion_text)
     
     def show_ai_solution(self):
-        # Show the AI's optimal solution
+        # Start the AI's search in the background and animate it as it runs
         if self.game_mode == "setup":
             messagebox.showinfo("Start Game First", "Please start the game first!")
             return
+        if self.animation_running:
+            return
 
+        self.mode_before_solve = self.game_mode
         self.game_mode = "comparing"
+        self.animation_running = True
+        self.ai_path = None
+        self.draw_graph()
+        self.draw_user_path()
+        self.ai_solution_btn.config(state="disabled")
+        self.cancel_btn.pack(pady=5, fill=tk.X, after=self.ai_solution_btn)
+        self.update_result_text("AI is searching...\n\nExplored roads light up as the search grows.")
+
+        events = queue.SimpleQueue()
+        cancel = threading.Event()
+        self.solve = (events, cancel)
+        front = self.query_cache.cached_front(self.start_city.cityName, self.goal_city.cityName, self.max_coins)
+        if front is not None:
+            events.put(("done", front))
+        else:
+            worker = threading.Thread(target=self.solve_in_background,
+                                      args=(self.start_city, self.goal_city, self.max_coins, events, cancel),
+                                      daemon=True)
+            worker.start()
+        self.root.after(self.FRAME_MS, self.poll_ai_solution, self.solve)
+
+    def solve_in_background(self, start_city, goal_city, max_coins, events, cancel):
+        """
+        Worker thread: run the search, streaming its events; never touches Tk.
+        Each solve has its own PathFinder and trace, so a solve that is still
+        winding down after a cancel cannot disturb the next one.
+        """
+        explored = set()  # each road is sent once, so the queue never outgrows the graph
+
+        def forward(event, *cities):
+            if cancel.is_set():
+                raise SearchCancelled()
+            if event == "explore":
+                city1, city2 = cities
+                road = (city1, city2) if city1.cityName < city2.cityName else (city2, city1)
+                if road in explored:
+                    return
+                explored.add(road)
+            events.put((event, *cities))
+
+        # One A* sweep that answers every budget up to the player's
+        pathfinder = PathFinder(trace=CallbackTrace(forward))
+        try:
+            front = pathfinder.pareto_front(start_city, goal_city, max_coins, heuristic=self.heuristic)
+            events.put(("done", front, (start_city.cityName, goal_city.cityName, max_coins)))
+        except SearchCancelled:
+            events.put(("cancelled",))
+        except Exception as error:
+            events.put(("error", error))
+
+    def poll_ai_solution(self, solve):
+        """Main thread: draw the next batch of search events, or finish when the search has ended"""
+        if solve is not self.solve:
+            return  # the game was reset while searching
+        events, _ = solve
+        for _ in range(self.EVENTS_PER_FRAME):
+            try:
+                event = events.get_nowait()
+            except queue.Empty:
+                break
+            if event[0] == "visit":
+                self.highlight_search_city(event[1])
+            elif event[0] == "explore":
+                self.highlight_search_road(event[1], event[2])
+            elif event[0] != "reset":
+                self.end_ai_solution(event)
+                return
+        self.root.after(self.FRAME_MS, self.poll_ai_solution, solve)
+
+    def highlight_search_city(self, city):
+        if city.cityName not in self.search_cities:
+            self.search_cities.add(city.cityName)
+            self.canvas.itemconfigure(self.city_items[city.cityName][0], width=6)
+
+    def highlight_search_road(self, city1, city2):
+        key = tuple(sorted((city1.cityName, city2.cityName)))
+        if key not in self.search_roads and key in self.road_items:
+            self.search_roads.add(key)
+            self.canvas.itemconfigure(self.road_items[key][0], fill="#DA9F93", width=3)
+
+    def clear_search_highlight(self):
+        for city_name in self.search_cities:
+            self.canvas.itemconfigure(self.city_items[city_name][0], width=3)
+        for key in self.search_roads:
+            self.canvas.itemconfigure(self.road_items[key][0], fill="white", width=2)
+        self.search_cities = set()
+        self.search_roads = set()
+
+    def cancel_ai_solution(self):
+        if self.solve is not None:
+            self.solve[1].set()
+
+    def stop_ai_solution(self):
+        """Stop following the background search and restore the buttons"""
+        if self.solve is not None:
+            self.solve[1].set()
+            self.solve = None
+        self.animation_running = False
+        self.clear_search_highlight()
+        self.cancel_btn.pack_forget()
+        self.ai_solution_btn.config(state="normal")
+
+    def end_ai_solution(self, event):
+        self.stop_ai_solution()
+        if event[0] == "cancelled":
+            self.game_mode = self.mode_before_solve
+            self.update_result_text("AI search cancelled.\n\nClick 'Show AI Solution' to run it again.")
+        elif event[0] == "error":
+            self.game_mode = self.mode_before_solve
+            messagebox.showerror("AI Search Failed", str(event[1]))
+        else:
+            if len(event) > 2:
+                self.query_cache.store_front(*event[2], event[1])  # fresh search, cached on the Tk thread
+            self.finish_ai_solution(event[1])
 
-        # Run A* algorithm
-        ai_path, ai_distance, ai_coins = self.pathfinder.a_star_with_coins(
-            self.start_city, self.goal_city, self.max_coins
-        )
+    def finish_ai_solution(self, ai_front):
+        # Show the AI's optimal solution next to the player's path
+        ai_path, ai_distance, ai_coins = ai_front.best_for(self.max_coins)
 
         if ai_path is None:
             messagebox.showerror("No Solution", "AI couldn't find a path within coin budget!")
             return
 
-        # Compute scaling and offsets 
-        xs, ys = [], []
-        for name in self.graph.get_city_names():
-            x, y = self.graph.get_position(name)
-            xs.append(x)
-            ys.append(y)
-
-        min_x, max_x = min(xs), max(xs)
-        min_y, max_y = min(ys), max(ys)
-
-        graph_w = max_x - min_x
-        graph_h = max_y - min_y
-
-        canvas_w = self.canvas.winfo_width()
-        canvas_h = self.canvas.winfo_height()
-        if canvas_w < 10 or canvas_h < 10:
-            self.canvas.update_idletasks()
-            canvas_w = self.canvas.winfo_width()
-            canvas_h = self.canvas.winfo_height()
-
-        margin = 40
-        usable_w = canvas_w - margin * 2
-        usable_h = canvas_h - margin * 2
-        scale_x = usable_w / graph_w if graph_w > 0 else 1
-        scale_y = usable_h / graph_h if graph_h > 0 else 1
-        SCALE = min(scale_x, scale_y)
-
-        scaled_w = graph_w * SCALE
-        scaled_h = graph_h * SCALE
-        offset_x = (canvas_w - scaled_w) // 2 - min_x * SCALE
-        offset_y = (canvas_h - scaled_h) // 2 - min_y * SCALE
-
-        def T(px, py):
-            return px * SCALE + offset_x, py * SCALE + offset_y
-
         # Draw AI path
+        self.ai_path = ai_path
         self.draw_graph()
         self.draw_user_path()
-
-        for i in range(len(ai_path) - 1):
-            city1 = ai_path[i]
-            city2 = ai_path[i + 1]
-            x1, y1 = self.graph.get_position(city1.cityName)
-            x2, y2 = self.graph.get_position(city2.cityName)
-            sx1, sy1 = T(x1, y1)
-            sx2, sy2 = T(x2, y2)
-
-            self.canvas.create_line(
-                sx1, sy1, sx2, sy2,
-                fill="#890620", width=3, tags="ai_path", dash=(10, 5)
-            )
+        self.draw_ai_path()
 
 
         # Compare results and update status
@@ -651,9 +789,10 @@ class PathFinderGUI:
         
         cumulative_g = 0
         cumulative_coins = 0
+        h_of = self.heuristic.for_goal(self.goal_city)
         
         for i, city in enumerate(ai_path):
-            h = int(city.get_heuristic())
+            h = int(h_of(city))
             
             if i == 0:
                 # Starting node
@@ -668,8 +807,8 @@ class PathFinderGUI:
                 # Subsequent nodes - show the calculation
                 prev_city = ai_path[i-1]
                 edge_info = prev_city.roads[city]
-                edge_dist = edge_info['distance']
-                edge_coins = edge_info['coins']
+                edge_dist = edge_info.distance
+                edge_coins = edge_info.coins
                 prev_g = cumulative_g
                 cumulative_g += edge_dist
                 cumulative_coins += edge_coins
@@ -683,6 +822,15 @@ class PathFinderGUI:
                 comparison_text += f"  Total Distance: {cumulative_g}\n"
                 comparison_text += f"  Total Coins: {cumulative_coins}\n\n"
         
+        comparison_text += "="*40 + "\n"
+        comparison_text += "BEST ROUTE AT EACH BUDGET:\n"
+        comparison_text += "="*40 + "\n\n"
+        for front_coins, front_distance, front_path in ai_front:
+            front_names = [city.cityName for city in front_path]
+            comparison_text += f"{front_coins}+ coins: distance {front_distance}\n"
+            comparison_text += f"  {' → '.join(front_names)}\n"
+        comparison_text += "\n"
+        
         comparison_text += "="*40 + "\n"
         comparison_text += f"FINAL TOTALS:\n"
         comparison_text += f"Total Distance: {ai_distance}\n"
@@ -710,21 +858,37 @@ class PathFinderGUI:
         self.update_result_text(comparison_text)
 
 
+    def draw_ai_path(self):
+        # Dashed overlay of the AI route with a legend
+        for i in range(len(self.ai_path) - 1):
+            sx1, sy1 = self.viewport.position(self.ai_path[i].cityName)
+            sx2, sy2 = self.viewport.position(self.ai_path[i + 1].cityName)
+
+            self.canvas.create_line(
+                sx1, sy1, sx2, sy2,
+                fill="#890620", width=3, tags="ai_path", dash=(10, 5)
+            )
+
         # Add legend
         legend_y = 20
-        self.canvas.create_line(20, legend_y, 60, legend_y, fill="#B6465F", width=4)
+        self.canvas.create_line(20, legend_y, 60, legend_y, fill="#B6465F", width=4, tags="legend")
         self.canvas.create_text(
-            120, legend_y, text="Your Path", fill="#B6465F", font=("Almendra", 15, "bold"), anchor=tk.W
+            120, legend_y, text="Your Path", fill="#B6465F", font=("Almendra", 15, "bold"), anchor=tk.W,
+            tags="legend"
         )
 
-        self.canvas.create_line(20, legend_y + 25, 60, legend_y + 25, fill="#890620", width=3, dash=(10, 5))
+        self.canvas.create_line(20, legend_y + 25, 60, legend_y + 25, fill="#890620", width=3, dash=(10, 5),
+                                tags="legend")
         self.canvas.create_text(
-            120, legend_y + 25, text="AI Optimal Path", fill="#890620", font=("Almendra", 15, "bold"), anchor=tk.W
+            120, legend_y + 25, text="AI Optimal Path", fill="#890620", font=("Almendra", 15, "bold"), anchor=tk.W,
+            tags="legend"
         )
 
     
     def reset_game(self):
         # Reset the game
+        if self.animation_running:
+            self.stop_ai_solution()
         self.game_mode = "setup"
         self.start_city = None
         self.goal_city = None
@@ -732,6 +896,10 @@ class PathFinderGUI:
         self.user_path = []
         self.user_distance = 0
         self.user_coins = 0
+        self.ai_path = None
+        if self.planner is not None:
+            self.planner.close()
+            self.planner = None
         
         self.start_combo.config(state="readonly")
         self.dest_combo.config(state="readonly")
@@ -0,0 +1,97 @@
+import math
+
+
+class HeuristicProvider:
+    """
+    Base class for goal-aware heuristics.
+    A provider builds, once per query, a function estimating the remaining
+    distance from any city to the chosen goal.
+    """
+
+    def for_goal(self, goal_city):
+        """Return h(city) -> estimated distance from city to goal_city"""
+        raise NotImplementedError
+
+    def for_goal_id(self, graph, goal_id: int):
+        """Return h(city_id) -> estimated distance on a CompiledGraph"""
+        raise NotImplementedError
+
+
+class StoredHeuristic(HeuristicProvider):
+    """The fixed per-city value passed to CityGraph.add_city (ignores the goal)"""
+
+    def for_goal(self, goal_city):
+        return lambda city: city.get_heuristic()
+
+    def for_goal_id(self, graph, goal_id: int):
+        return graph.heuristics.__getitem__
+
+
+class ZeroHeuristic(HeuristicProvider):
+    """No guidance: A* degrades to Dijkstra but stays optimal"""
+
+    def for_goal(self, goal_city):
+        return lambda city: 0
+
+    def for_goal_id(self, graph, goal_id: int):
+        return lambda city_id: 0
+
+
+class EuclideanHeuristic(HeuristicProvider):
+    """
+    Straight-line distance between positions, scaled by the smallest
+    distance-per-unit of any road so it never overestimates.
+    The graph tracks that ratio as roads are added, so the heuristic is
+    consistent by construction. Works on both CityGraph and CompiledGraph.
+    """
+
+    def __init__(self, graph, scale: float = None):
+        self.graph = graph
+        self.fixed_scale = scale
+        self.get_scale()  # validate a fixed scale against the graph as built
+
+    def get_scale(self):
+        """Largest admissible scale for the graph as it is now"""
+        limit = self.graph.min_distance_per_unit
+        if limit == math.inf:
+            limit = 0.0  # no roads with length yet, so no guidance
+        if self.fixed_scale is None:
+            return limit
+        if self.fixed_scale > limit:
+            raise ValueError(f"Scale {self.fixed_scale} is not admissible, roads allow at most {limit}.")
+        return self.fixed_scale
+
+    def for_goal(self, goal_city):
+        positions = self.graph.positions
+        scale = self.get_scale()
+        gx, gy = positions[goal_city.cityName]
+
+        def h(city):
+            x, y = positions[city.cityName]
+            return scale * math.hypot(x - gx, y - gy)
+        return h
+
+    def for_goal_id(self, graph, goal_id: int):
+        xs = graph.xs
+        ys = graph.ys
+        scale = self.get_scale()
+        gx = xs[goal_id]
+        gy = ys[goal_id]
+        hypot = math.hypot
+        return lambda city_id: scale * hypot(xs[city_id] - gx, ys[city_id] - gy)
+
+
+def check_consistent(graph, provider, goal_city):
+    """
+    Verify h(goal) == 0 and h(u) <= distance(u, v) + h(v) on every road.
+    A consistent heuristic is admissible, so A* stays optimal.
+    Raises ValueError naming the first violation.
+    """
+    h = provider.for_goal(goal_city)
+    if h(goal_city) > 1e-9:
+        raise ValueError(f"Heuristic is not zero at goal {goal_city.cityName}.")
+    for city in graph.cities.values():
+        h_city = h(city)
+        for neighbor, road in city.roads.items():
+            if h_city > road.distance + h(neighbor) + 1e-9:
+                raise ValueError(f"Heuristic not consistent on road {city.cityName}-{neighbor.cityName}.")
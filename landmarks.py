@@ -0,0 +1,138 @@
+import math
+import mmap
+import struct
+from array import array
+from heuristics import HeuristicProvider
+
+# File layout: header, landmark ids (int32, padded to 8 bytes), then a
+# float64 table with one row of k landmark distances per city.
+MAGIC = b"CCPFALT1"
+HEADER = struct.Struct("<8sIIq")  # magic, landmarks, cities, directed roads
+
+
+class LandmarkIndex:
+    """
+    ALT preprocessing for a CompiledGraph: shortest distances between every
+    city and k landmark cities. By the triangle inequality
+    |d(L, goal) - d(L, city)| never overestimates d(city, goal).
+    """
+
+    def __init__(self, graph, landmarks, table):
+        self.graph = graph
+        self.landmarks = landmarks  # landmark city ids
+        self.table = table  # flat, table[city * k + j] = d(landmark j, city)
+        self.k = len(landmarks)
+        self._mmap = None
+
+    @classmethod
+    def build(cls, graph, k: int = 8):
+        """
+        Pick k landmarks by farthest-point selection and run one Dijkstra from each.
+        Unreached components are chosen first, so every component gets a landmark.
+        """
+        n = graph.num_cities()
+        k = min(k, n)
+        landmarks = []
+        columns = []
+        closest = array('d', [math.inf]) * n  # distance to the nearest chosen landmark
+        seed = graph.dijkstra(0) if n else []
+
+        while len(landmarks) < k:
+            if not landmarks:
+                candidates = seed
+            else:
+                candidates = closest
+            best = max(range(n), key=lambda v: (candidates[v] if v not in landmarks else -1.0))
+            if best in landmarks:
+                break
+            dist = graph.dijkstra(best)
+            landmarks.append(best)
+            columns.append(dist)
+            for v in range(n):
+                if dist[v] < closest[v]:
+                    closest[v] = dist[v]
+
+        k = len(landmarks)
+        table = array('d', [0.0]) * (n * k)
+        for j, dist in enumerate(columns):
+            for v in range(n):
+                table[v * k + j] = dist[v]
+        return cls(graph, array('i', landmarks), table)
+
+    def save(self, path: str):
+        """Write the index as a compact binary file"""
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, self.k, self.graph.num_cities(), self.graph.num_roads()))
+            ids = array('i', self.landmarks)
+            f.write(ids.tobytes())
+            f.write(b"\0" * (-len(ids) * ids.itemsize % 8))
+            f.write(array('d', self.table).tobytes())
+
+    @classmethod
+    def load(cls, path: str, graph):
+        """Memory-map an index file written by save() for the same graph"""
+        with open(path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, k, num_cities, num_roads = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC:
+            mm.close()
+            raise ValueError(f"{path} is not a landmark index.")
+        if num_cities != graph.num_cities() or num_roads != graph.num_roads():
+            mm.close()
+            raise ValueError(f"{path} was built for a different graph.")
+
+        view = memoryview(mm)
+        start = HEADER.size
+        landmarks = view[start:start + 4 * k].cast('i')
+        start += 4 * k + (-4 * k % 8)
+        table = view[start:start + 8 * k * num_cities].cast('d')
+        index = cls(graph, landmarks, table)
+        index._mmap = mm
+        return index
+
+    def lower_bound(self, u: int, v: int):
+        """Landmark lower bound on the distance between two city ids"""
+        return LandmarkHeuristic(self).for_goal_id(self.graph, v)(u)
+
+    def memory_bytes(self):
+        return self.table.itemsize * len(self.table)
+
+    def close(self):
+        """Release the memory map of a loaded index"""
+        if self._mmap is not None:
+            self.table.release()
+            self.landmarks.release()
+            self._mmap.close()
+            self._mmap = None
+
+
+class LandmarkHeuristic(HeuristicProvider):
+    """ALT heuristic: the best landmark lower bound toward the goal"""
+
+    def __init__(self, index):
+        self.index = index
+
+    def for_goal(self, goal_city):
+        graph = self.index.graph
+        h_id = self.for_goal_id(graph, graph.index_of(goal_city.cityName))
+        ids = graph.index
+        return lambda city: h_id(ids[city.cityName])
+
+    def for_goal_id(self, graph, goal_id: int):
+        table = self.index.table
+        k = self.index.k
+        # Landmarks that cannot reach the goal give no bound
+        goal_row = [(j, table[goal_id * k + j]) for j in range(k)
+                    if table[goal_id * k + j] != math.inf]
+
+        def h(city_id):
+            base = city_id * k
+            best = 0.0
+            for j, goal_dist in goal_row:
+                bound = goal_dist - table[base + j]
+                if bound < 0:
+                    bound = -bound
+                if bound > best:
+                    best = bound
+            return best
+        return h
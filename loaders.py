@@ -0,0 +1,269 @@
+import argparse
+import csv
+import struct
+import time
+from array import array
+from itertools import islice
+from compiled_graph import CompiledGraph
+from graph import CityGraph
+
+CHUNK_SIZE = 65536  # rows inserted per bulk call
+
+# Binary edge-list format, little-endian:
+#   header: magic, number of cities, number of roads
+#   city name lengths (uint32 each), then the UTF-8 names back to back
+#   heuristics, xs, ys (float64 each)
+#   roads in blocks of up to CHUNK_SIZE, each block stored column by column:
+#   city1 ids (int32), city2 ids (int32), distances (float64), coins (int32)
+MAGIC = b"CCPFEDG1"
+HEADER = struct.Struct("<8sqq")
+
+
+def _number(text: str):
+    """Parse an int if the text is integral, otherwise a float"""
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def _chunks(rows, size: int):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def read_nodes_csv(path: str):
+    """Stream (name, heuristic, x, y) rows from a CSV with a name,heuristic,x,y header"""
+    with open(path, newline='') as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for name, heuristic, x, y in reader:
+            yield name, _number(heuristic), _number(x), _number(y)
+
+
+def read_edges_csv(path: str):
+    """Stream (city1, city2, distance, coins) rows from a CSV with a city1,city2,distance,coins header"""
+    with open(path, newline='') as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for city1, city2, distance, coins in reader:
+            yield city1, city2, _number(distance), int(coins)
+
+
+def read_edge_list(path: str):
+    """Stream (city1, city2, distance, coins) rows from a whitespace-separated edge list ('#' comments)"""
+    with open(path) as f:
+        for line in f:
+            fields = line.split()
+            if not fields or fields[0].startswith('#'):
+                continue
+            city1, city2, distance, coins = fields
+            yield city1, city2, _number(distance), int(coins)
+
+
+def build_graph(node_rows, edge_rows, check_duplicates: bool = True, compiled: bool = False,
+                chunk_size: int = CHUNK_SIZE):
+    """
+    Build a graph from streamed rows in bulk chunks.
+    node_rows may be None, in which case cities are created at (0, 0) with
+    heuristic 0 the first time a road mentions them.
+    check_duplicates=False takes the fast path: no per-road checks, one
+    validate_roads() pass at the end.
+    compiled=True builds a CompiledGraph straight from arrays without City
+    objects (parallel roads are kept as given, self-loops are rejected).
+    """
+    if compiled:
+        return _build_compiled(node_rows, edge_rows, chunk_size)
+
+    graph = CityGraph()
+    if node_rows is not None:
+        for chunk in _chunks(node_rows, chunk_size):
+            graph.add_cities(chunk)
+
+    for chunk in _chunks(edge_rows, chunk_size):
+        if node_rows is None:
+            new_names = {name for city1, city2, _, _ in chunk for name in (city1, city2)
+                         if name not in graph.cities}
+            graph.add_cities((name, 0, 0, 0) for name in new_names)
+        graph.connect_many(chunk, check_duplicates=check_duplicates)
+
+    if not check_duplicates:
+        graph.validate_roads()
+    return graph
+
+
+def _build_compiled(node_rows, edge_rows, chunk_size):
+    names = []
+    index = {}
+    xs = array('d')
+    ys = array('d')
+    heuristics = array('d')
+
+    def add(name, heuristic, x, y):
+        index[name] = len(names)
+        names.append(name)
+        heuristics.append(heuristic)
+        xs.append(x)
+        ys.append(y)
+
+    if node_rows is not None:
+        for name, heuristic, x, y in node_rows:
+            add(name, heuristic, x, y)
+
+    sources = array('i')
+    targets = array('i')
+    distances = array('d')
+    coins = array('i')
+    for chunk in _chunks(edge_rows, chunk_size):
+        for city1, city2, distance, cost in chunk:
+            if city1 == city2:
+                raise ValueError(f"{city1} cannot be connected to itself.")
+            if distance < 0:
+                raise ValueError(f"Road {city1}-{city2} has negative distance.")
+            for name in (city1, city2):
+                if name not in index:
+                    if node_rows is not None:
+                        raise KeyError(name)
+                    add(name, 0, 0, 0)
+            sources.append(index[city1])
+            targets.append(index[city2])
+            distances.append(distance)
+            coins.append(cost)
+
+    return CompiledGraph.from_edges(names, xs, ys, heuristics, sources, targets, distances, coins)
+
+
+def load_csv(nodes_path: str, edges_path: str, **options):
+    """Load a graph from a nodes CSV and an edges CSV (see build_graph for options)"""
+    return build_graph(read_nodes_csv(nodes_path), read_edges_csv(edges_path), **options)
+
+
+def load_edge_list(path: str, nodes_path: str = None, **options):
+    """Load a graph from an edge list, with an optional nodes CSV for positions"""
+    node_rows = read_nodes_csv(nodes_path) if nodes_path else None
+    return build_graph(node_rows, read_edge_list(path), **options)
+
+
+def save_binary(graph, path: str):
+    """Write a CityGraph in the binary edge-list format"""
+    names = graph.get_city_names()
+    index = {name: i for i, name in enumerate(names)}
+    encoded = [name.encode('utf-8') for name in names]
+    roads = ((index[name], index[neighbor.cityName], road.distance, road.coins)
+             for name in names
+             for neighbor, road in graph.cities[name].roads.items()
+             if index[neighbor.cityName] > index[name])
+    blocks = list(_chunks(roads, CHUNK_SIZE))
+
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(names), sum(len(block) for block in blocks)))
+        f.write(array('I', [len(name) for name in encoded]).tobytes())
+        f.write(b"".join(encoded))
+        f.write(array('d', [graph.cities[name].get_heuristic() for name in names]).tobytes())
+        f.write(array('d', [graph.positions[name][0] for name in names]).tobytes())
+        f.write(array('d', [graph.positions[name][1] for name in names]).tobytes())
+        for block in blocks:
+            for typecode, column in zip('iidi', zip(*block)):
+                f.write(array(typecode, column).tobytes())
+
+
+def _read_road_blocks(f, num_roads: int):
+    """Yield (city1 ids, city2 ids, distances, coins) arrays block by block"""
+    remaining = num_roads
+    while remaining:
+        count = min(CHUNK_SIZE, remaining)
+        block = []
+        for typecode in 'iidi':
+            column = array(typecode)
+            column.fromfile(f, count)
+            block.append(column)
+        yield block
+        remaining -= count
+
+
+def load_binary(path: str, check_duplicates: bool = True, compiled: bool = False):
+    """Load a graph written by save_binary, reading one block of roads at a time"""
+    with open(path, 'rb') as f:
+        magic, num_cities, num_roads = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a binary edge list.")
+
+        lengths = array('I')
+        lengths.fromfile(f, num_cities)
+        blob = f.read(sum(lengths))
+        names = []
+        start = 0
+        for length in lengths:
+            names.append(blob[start:start + length].decode('utf-8'))
+            start += length
+        del blob
+
+        columns = []
+        for _ in range(3):
+            column = array('d')
+            column.fromfile(f, num_cities)
+            columns.append(column)
+        heuristics, xs, ys = columns
+
+        if compiled:
+            # Ids are already dense, so the road columns are used as they are
+            sources = array('i')
+            targets = array('i')
+            distances = array('d')
+            coins = array('i')
+            for block in _read_road_blocks(f, num_roads):
+                for column, values in zip((sources, targets, distances, coins), block):
+                    column.extend(values)
+            if any(distance < 0 for distance in distances):
+                raise ValueError(f"{path} has a road with negative distance.")
+            for u, v in zip(sources, targets):
+                if u == v:
+                    raise ValueError(f"{names[u]} cannot be connected to itself.")
+            return CompiledGraph.from_edges(names, xs, ys, heuristics, sources, targets, distances, coins)
+
+        def road_rows():
+            for block in _read_road_blocks(f, num_roads):
+                for u, v, distance, coins in zip(*block):
+                    yield names[u], names[v], distance, coins
+
+        return build_graph(zip(names, heuristics, xs, ys), road_rows(), check_duplicates=check_duplicates)
+
+
+def convert(output_path: str, csv_paths=None, edge_list=None, nodes_path=None, binary=None):
+    """Convert a CSV pair, an edge list or a binary edge list to a memory-mapped graph file"""
+    if csv_paths:
+        graph = load_csv(*csv_paths, compiled=True)
+    elif edge_list:
+        graph = load_edge_list(edge_list, nodes_path, compiled=True)
+    elif binary:
+        graph = load_binary(binary, compiled=True)
+    else:
+        from graph import create_sample_graph
+        graph = create_sample_graph().compile()
+    graph.save(output_path)
+    return graph
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert a road network to a memory-mapped graph file "
+                                                 "(opened with CompiledGraph.open or main.py)")
+    parser.add_argument("output", help="graph file to write")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--csv", nargs=2, metavar=("NODES", "EDGES"), help="nodes and edges CSV files")
+    source.add_argument("--edge-list", metavar="EDGES", help="whitespace-separated edge list")
+    source.add_argument("--binary", metavar="EDGES", help="binary edge list written by save_binary")
+    parser.add_argument("--nodes", help="nodes CSV for --edge-list positions")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    graph = convert(args.output, args.csv, args.edge_list, args.nodes, args.binary)
+    print(f"Wrote {graph.num_cities()} cities and {graph.num_roads() // 2} roads to {args.output} "
+          f"in {time.perf_counter() - start:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
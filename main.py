@@ -1,11 +1,18 @@
 # main.py
+import sys
 import tkinter as tk
+from compiled_graph import CompiledGraph
 from graph import create_sample_graph
 from gui import PathFinderGUI
 
 def main():
-    # Create the graph
-    graph = create_sample_graph()
+    # Create the graph, or open one written by `python3 loaders.py` if a path is given
+    if len(sys.argv) > 1:
+        compiled = CompiledGraph.open(sys.argv[1])
+        graph = compiled.to_city_graph()
+        compiled.close()
+    else:
+        graph = create_sample_graph()
     
     # Create the main window
     root = tk.Tk()
@@ -1,25 +1,72 @@
+from collections import namedtuple
+
+
+class Road(namedtuple('Road', ['distance', 'coins'])):
+    """
+    Immutable distance/coin record of one road, shared by both endpoints.
+    Any further resources of the graph's schema (CityGraph.resources, e.g.
+    time or fuel) follow in the same tuple: road.extra holds them and
+    road.resources is the whole cost vector (coins, *extra).
+    Search loops read road.distance and road.coins; road['distance'] and
+    road.get('coins') keep working for code written against the old dicts.
+    """
+    __slots__ = ()
+
+    def __new__(cls, distance, coins, *extra):
+        return tuple.__new__(cls, (distance, coins, *extra))
+
+    def __repr__(self):
+        extra = f", extra={self.extra}" if len(self) > 2 else ""
+        return f"Road(distance={self.distance!r}, coins={self.coins!r}{extra})"
+
+    @property
+    def extra(self):
+        return tuple.__getitem__(self, slice(2, None))
+
+    @property
+    def resources(self):
+        return tuple.__getitem__(self, slice(1, None))
+
+    def __getitem__(self, key):
+        if key.__class__ is str:
+            if key not in self._fields:
+                raise KeyError(key)
+            return getattr(self, key)
+        return tuple.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self._fields else default
+
+    def keys(self):
+        return self._fields
+
+
 class City:
+    __slots__ = ('cityName', 'heuristic', 'roads')
+
     def __init__(self, cityName, heuristic):
         self.cityName = cityName
         self.heuristic = heuristic
         self.roads = {}  # dictionary for the city to be able to connect to multiple cities
 
-    def connect(self, neighbor_city, distance, coins):
-        """Connect to a neighbor city with distance and coin cost"""
+    def connect(self, neighbor_city, distance, coins, *extra):
+        """Connect to a neighbor city with distance, coin cost and any extra resources"""
         # Raise an error if the node connection already exists
+        if neighbor_city is self:
+            raise ValueError(f"{self.cityName} cannot be connected to itself.")
         if neighbor_city in self.roads:
             raise ValueError(f"{self.cityName} already connected to {neighbor_city.cityName}.")
         if self in neighbor_city.roads:
             raise ValueError(f"{neighbor_city.cityName} already connected to {self.cityName}.")
-        
-        # Create the connection going both ways with distance and coins
-        self.roads[neighbor_city] = {'distance': distance, 'coins': coins}
-        neighbor_city.roads[self] = {'distance': distance, 'coins': coins}
+
+        # Create the connection going both ways, sharing one record
+        road = Road(distance, coins, *extra)
+        self.roads[neighbor_city] = road
+        neighbor_city.roads[self] = road
 
     def get_heuristic(self):
         return self.heuristic
-    
+
     def get_cost_to(self, neighbor_city):
         """Return the cost info if the connection exists, otherwise return None"""
         return self.roads.get(neighbor_city, None)
-
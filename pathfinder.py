@@ -1,73 +1,717 @@
 import heapq
-from typing import List, Tuple, Optional
+import math
+from itertools import islice
+from operator import add, le
+from bisect import bisect_left, bisect_right
+from heuristics import StoredHeuristic, ZeroHeuristic
+from search_stats import instrumented
+
+
+def _insert_label(front, distance, coins):
+    """
+    Insert (coins, distance) into a Pareto front kept sorted by coins ascending
+    (and therefore distance descending).
+    Returns (inserted, evicted): inserted is False if the label is dominated,
+    evicted is how many existing labels the new one dominates.
+    """
+    i = bisect_left(front, (coins,))
+
+    # A label with no more coins and no longer distance dominates the new one
+    if i > 0 and front[i - 1][1] <= distance:
+        return False, 0
+    if i < len(front) and front[i][0] == coins and front[i][1] <= distance:
+        return False, 0
+
+    # Labels with more coins and no shorter distance are now dominated
+    j = i
+    while j < len(front) and front[j][1] >= distance:
+        j += 1
+    front[i:j] = [(coins, distance)]
+    return True, j - i
+
+
+def _insert_vector_label(front, distance, used, label):
+    """
+    Insert a label into a front of (distance, label, used) entries sorted by
+    distance, where used is the label's resource vector.
+    Returns (inserted, evicted_labels): inserted is False if a label no longer
+    than the new one uses no more of every resource, evicted_labels lists the
+    ids of labels the new one dominates.
+    Only shorter labels can dominate and only longer ones can be dominated,
+    so each side is found by binary search instead of scanning the front.
+    """
+    i = bisect_right(front, (distance, math.inf))
+    for k in range(i):
+        if all(map(le, front[k][2], used)):
+            return False, ()
+
+    j = bisect_left(front, (distance, -1))
+    evicted = [entry[1] for entry in front[j:] if all(map(le, used, entry[2]))]
+    if evicted:
+        front[j:] = [entry for entry in front[j:] if not all(map(le, used, entry[2]))]
+        i = bisect_right(front, (distance, math.inf))
+    front.insert(i, (distance, label, used))
+    return True, evicted
+
+
+def _has_label(front, distance, coins):
+    """Check whether (coins, distance) is still on the Pareto front"""
+    i = bisect_left(front, (coins, distance))
+    return i < len(front) and front[i] == (coins, distance)
+
+
+def _reconstruct_path(label_cities, label_parents, label):
+    """Follow predecessor links from a label back to the start and return the route"""
+    path = []
+    while label != -1:
+        path.append(label_cities[label])
+        label = label_parents[label]
+    path.reverse()
+    return path
+
+
+def _best_settled(settled, coins_left):
+    """
+    Shortest settled label with at most coins_left coins.
+    settled is (distances, negated coins, labels) in pop order, so distances
+    ascend and coins strictly descend. Returns (distance, coins, label) or None.
+    """
+    distances, neg_coins, labels = settled
+    i = bisect_left(neg_coins, -coins_left)
+    if i == len(labels):
+        return None
+    return distances[i], -neg_coins[i], labels[i]
+
+
+class ParetoFront:
+    """
+    Every non-dominated route between two cities up to a coin budget.
+    Entries are (coins, distance, path) sorted by coins ascending, so
+    distance strictly decreases along the list.
+    """
+    def __init__(self, entries):
+        self.entries = entries
+        self.coins = [coins for coins, _, _ in entries]
+    
+    def best_for(self, max_coins: int):
+        """
+        Shortest route using at most max_coins, found by binary search
+        Returns: (path, total_distance, coins_used) or (None, None, None)
+        """
+        i = bisect_right(self.coins, max_coins)
+        if i == 0:
+            return None, None, None
+        coins, distance, path = self.entries[i - 1]
+        return path, distance, coins
+    
+    def __len__(self):
+        return len(self.entries)
+    
+    def __iter__(self):
+        return iter(self.entries)
+
 
 class PathFinder:
-    def __init__(self):
-        self.visited_cities = []
-        self.explored_paths = []
+    def __init__(self, trace=None, stats_sink=None):
+        self.trace = trace  # Optional SearchTrace, tracing is off when None
+        self.stats_sink = stats_sink  # Optional callable given each query's SearchStats
+        self.stats = None  # SearchStats of the last query
+        self.profile_interval = 0.001  # Seconds between samples of a query run with profile=True
+        self._searching = False
+        self._reset_counters(max_heap=0)
+    
+    def _reset_counters(self, max_heap: int = 1):
+        """Zero the per-query counters read by @instrumented; a search starts with its root queued"""
+        self.pruned_labels = 0
+        self.expansions = 0
+        self.pushes = 0
+        self.stale_skips = 0
+        self.pruned_by_budget = 0
+        self.max_heap = max_heap
     
-    def a_star_with_coins(self, start_city, goal_city, max_coins: int):
+    @instrumented()
+    def a_star_with_coins(self, start_city, goal_city, max_coins: int, pareto: bool = False,
+                          heuristic=None, bounds=None):
         """
         A* algorithm with coin constraint
+        With pareto=True each city keeps a Pareto front of (distance, coins) labels
+        and dominated labels are dropped instead of opening a state per coin total.
+        heuristic is a HeuristicProvider asked for an estimate toward goal_city;
+        by default the stored City.heuristic values are used.
+        bounds is a GoalBounds cache; with it, labels that cannot reach the goal
+        within the budget are dropped and min-distance-to-goal replaces heuristic.
         Returns: (path, total_distance, coins_used) or (None, None, None) if no path exists
         """
         # Counter to ensure unique priorities and avoid City comparison
+        # It also serves as the label id indexing the predecessor links below
         counter = 0
+        trace = self.trace
+        if trace is not None:
+            trace.reset()
+        self._reset_counters()
         
-        # Priority queue: (f_score, distance, coins_used, counter, current_city, path)
-        pq = [(start_city.get_heuristic(), 0, 0, counter, start_city, [start_city])]
+        # Goal-aware estimate for this query
+        if bounds is not None:
+            min_distance, min_coins = bounds.for_goal(goal_city)
+            if min_coins.get(start_city, math.inf) > max_coins:
+                return None, None, None
+            h_of = min_distance.__getitem__
+        else:
+            min_coins = None
+            h_of = (heuristic or StoredHeuristic()).for_goal(goal_city)
+        
+        # Priority queue: (f_score, distance, coins_used, counter, current_city)
+        pq = [(h_of(start_city), 0, 0, counter, start_city)]
+        label_cities = [start_city]  # Maps label id to its city
+        label_parents = [-1]  # Maps label id to its predecessor label id
         visited = {}  # Maps (city, coins_used) to best distance found
-        self.visited_cities = []
-        self.explored_paths = []
+        fronts = {start_city: [(0, 0)]}  # Maps city to its Pareto front (pareto mode)
         
         while pq:
-            f_score, distance, coins_used, _, current_city, path = heapq.heappop(pq)
+            f_score, distance, coins_used, label, current_city = heapq.heappop(pq)
             
             # Track for visualization
-            if current_city not in self.visited_cities:
-                self.visited_cities.append(current_city)
-            
-            # State includes both city and coins used (for coin-constrained search)
-            state = (current_city, coins_used)
+            if trace is not None:
+                trace.visit(current_city)
             
-            # Skip if we've found a better path to this state
-            if state in visited and visited[state] <= distance:
-                continue
+            if pareto:
+                # Skip labels that were dominated after they were pushed
+                if not _has_label(fronts[current_city], distance, coins_used):
+                    self.stale_skips += 1
+                    continue
+            else:
+                # State includes both city and coins used (for coin-constrained search)
+                state = (current_city, coins_used)
+                
+                # Skip if we've found a better path to this state
+                if state in visited and visited[state] <= distance:
+                    self.stale_skips += 1
+                    continue
+                
+                visited[state] = distance
             
-            visited[state] = distance
+            self.expansions += 1
             
             # Goal check
             if current_city == goal_city:
+                path = _reconstruct_path(label_cities, label_parents, label)
+                self.pushes = len(label_cities) - 1
                 return path, distance, coins_used
             
             # Explore neighbors
-            for neighbor_city, edge_info in current_city.roads.items():
-                edge_distance = edge_info['distance']
-                edge_coins = edge_info['coins']
+            for neighbor_city, road in current_city.roads.items():
+                edge_distance = road.distance
+                edge_coins = road.coins
                 
                 new_coins = coins_used + edge_coins
                 
                 # Check coin constraint
                 if new_coins <= max_coins:
+                    # Drop the label if even the cheapest way on to the goal is over budget
+                    if min_coins is not None and new_coins + min_coins.get(neighbor_city, math.inf) > max_coins:
+                        self.pruned_labels += 1
+                        continue
+                    
                     new_distance = distance + edge_distance
-                    h = neighbor_city.get_heuristic()
+                    
+                    if pareto:
+                        # Drop the label if an earlier one here is shorter and cheaper
+                        front = fronts.setdefault(neighbor_city, [])
+                        inserted, evicted = _insert_label(front, new_distance, new_coins)
+                        self.pruned_labels += evicted
+                        if not inserted:
+                            self.pruned_labels += 1
+                            continue
+                    
+                    h = h_of(neighbor_city)
                     new_f = new_distance + h
-                    new_path = path + [neighbor_city]
                     
                     # Track explored paths for visualization
-                    self.explored_paths.append((current_city, neighbor_city))
+                    if trace is not None:
+                        trace.explore(current_city, neighbor_city)
                     
-                    # Increment counter for unique priority
+                    # Increment counter for unique priority and record the predecessor
                     counter += 1
-                    heapq.heappush(pq, (new_f, new_distance, new_coins, counter, neighbor_city, new_path))
+                    label_cities.append(neighbor_city)
+                    label_parents.append(label)
+                    heapq.heappush(pq, (new_f, new_distance, new_coins, counter, neighbor_city))
+                    if len(pq) > self.max_heap:
+                        self.max_heap = len(pq)
+                else:
+                    self.pruned_by_budget += 1
         
         # No path found within coin constraint
+        self.pushes = len(label_cities) - 1
+        return None, None, None
+    
+    @instrumented()
+    def a_star_with_resources(self, start_city, goal_city, budgets, heuristic=None):
+        """
+        A* algorithm with a budget per road resource (CityGraph.resources)
+        budgets is (max_coins, *max_extra) in schema order. Each city keeps the
+        labels whose resource vectors no other label there beats on distance and
+        on every resource at once. A coin-only budget is handed to the sorted
+        Pareto fronts of a_star_with_coins, which need no vector comparisons.
+        Returns: (path, total_distance, resources_used) or (None, None, None) if no path exists
+        """
+        budgets = tuple(budgets)
+        if len(budgets) == 1:
+            path, distance, coins = self.a_star_with_coins(start_city, goal_city, budgets[0], pareto=True,
+                                                           heuristic=heuristic)
+            return (path, distance, (coins,)) if path is not None else (None, None, None)
+        
+        trace = self.trace
+        if trace is not None:
+            trace.reset()
+        self._reset_counters()
+        h_of = (heuristic or StoredHeuristic()).for_goal(goal_city)
+        
+        start_used = (0,) * len(budgets)
+        # Priority queue: (f_score, distance, label), resource vectors live with the labels
+        pq = [(h_of(start_city), 0, 0)]
+        label_cities = [start_city]
+        label_parents = [-1]
+        label_used = [start_used]
+        label_alive = [True]  # Cleared when a later label dominates this one
+        fronts = {start_city: [(0, 0, start_used)]}
+        
+        while pq:
+            f_score, distance, label = heapq.heappop(pq)
+            if not label_alive[label]:
+                self.stale_skips += 1
+                continue
+            current_city = label_cities[label]
+            used = label_used[label]
+            
+            if trace is not None:
+                trace.visit(current_city)
+            self.expansions += 1
+            
+            if current_city == goal_city:
+                self.pushes = len(label_cities) - 1
+                return _reconstruct_path(label_cities, label_parents, label), distance, used
+            
+            for neighbor_city, road in current_city.roads.items():
+                new_used = tuple(map(add, used, islice(road, 1, None)))  # road.resources without the property call
+                if not all(map(le, new_used, budgets)):
+                    self.pruned_by_budget += 1
+                    continue
+                
+                new_distance = distance + road.distance
+                new_label = len(label_cities)
+                inserted, evicted = _insert_vector_label(fronts.setdefault(neighbor_city, []),
+                                                         new_distance, new_used, new_label)
+                for old_label in evicted:
+                    label_alive[old_label] = False
+                self.pruned_labels += len(evicted)
+                if not inserted:
+                    self.pruned_labels += 1
+                    continue
+                
+                if trace is not None:
+                    trace.explore(current_city, neighbor_city)
+                label_cities.append(neighbor_city)
+                label_parents.append(label)
+                label_used.append(new_used)
+                label_alive.append(True)
+                heapq.heappush(pq, (new_distance + h_of(neighbor_city), new_distance, new_label))
+                if len(pq) > self.max_heap:
+                    self.max_heap = len(pq)
+        
+        self.pushes = len(label_cities) - 1
         return None, None, None
     
+    @instrumented()
+    def pareto_front(self, start_city, goal_city, max_coins: int, heuristic=None, bounds=None):
+        """
+        Multi-criteria label-setting search answering every budget from 0 to max_coins
+        Labels are expanded in A* order, so heuristic must be consistent
+        (e.g. EuclideanHeuristic); the default is no heuristic.
+        bounds is an optional GoalBounds cache used for pruning and guidance.
+        Returns: ParetoFront of (coins, distance, path) entries
+        """
+        trace = self.trace
+        if trace is not None:
+            trace.reset()
+        self._reset_counters()
+        
+        if bounds is not None:
+            min_distance, min_coins = bounds.for_goal(goal_city)
+            if min_coins.get(start_city, math.inf) > max_coins:
+                return ParetoFront([])
+            h_of = min_distance.__getitem__
+        else:
+            min_coins = None
+            h_of = (heuristic or ZeroHeuristic()).for_goal(goal_city)
+        
+        # Priority queue: (f_score, distance, coins_used, label)
+        pq = [(h_of(start_city), 0, 0, 0)]
+        label_cities = [start_city]
+        label_parents = [-1]
+        fronts = {start_city: [(0, 0)]}
+        goal_front = fronts.setdefault(goal_city, [])
+        goal_labels = []  # (coins, distance, label) for goal labels that were popped
+        
+        while pq:
+            f_score, distance, coins_used, label = heapq.heappop(pq)
+            current_city = label_cities[label]
+            
+            if not _has_label(fronts[current_city], distance, coins_used):
+                self.stale_skips += 1
+                continue
+            
+            self.expansions += 1
+            if trace is not None:
+                trace.visit(current_city)
+            
+            # Goal labels are final, routes through the goal and back are dominated
+            if current_city == goal_city:
+                goal_labels.append((coins_used, distance, label))
+                continue
+            
+            for neighbor_city, road in current_city.roads.items():
+                new_coins = coins_used + road.coins
+                if new_coins > max_coins:
+                    self.pruned_by_budget += 1
+                    continue
+                
+                # Cheapest possible coins when this label reaches the goal
+                least_coins = new_coins
+                if min_coins is not None:
+                    least_coins += min_coins.get(neighbor_city, math.inf)
+                    if least_coins > max_coins:
+                        self.pruned_labels += 1
+                        continue
+                
+                new_distance = distance + road.distance
+                new_f = new_distance + h_of(neighbor_city)
+                
+                # Drop the label if a goal route already found is no longer and no dearer
+                i = bisect_right(goal_front, (least_coins, math.inf))
+                if i > 0 and goal_front[i - 1][1] <= new_f:
+                    self.pruned_labels += 1
+                    continue
+                
+                front = fronts.setdefault(neighbor_city, [])
+                inserted, evicted = _insert_label(front, new_distance, new_coins)
+                self.pruned_labels += evicted
+                if not inserted:
+                    self.pruned_labels += 1
+                    continue
+                
+                if trace is not None:
+                    trace.explore(current_city, neighbor_city)
+                label_cities.append(neighbor_city)
+                label_parents.append(label)
+                heapq.heappush(pq, (new_f, new_distance, new_coins, len(label_cities) - 1))
+                if len(pq) > self.max_heap:
+                    self.max_heap = len(pq)
+        
+        entries = [(coins, distance, _reconstruct_path(label_cities, label_parents, label))
+                   for coins, distance, label in sorted(goal_labels)
+                   if _has_label(goal_front, distance, coins)]
+        self.pushes = len(label_cities) - 1
+        return ParetoFront(entries)
+    
+    @instrumented(roots=2)
+    def bidirectional_with_coins(self, start_city, goal_city, max_coins: int):
+        """
+        Bidirectional coin-constrained search (roads are undirected)
+        A forward search from start and a backward search from goal each keep
+        per-city Pareto fronts and settle labels in distance order. Whenever a
+        label is settled, it is joined with the other side's settled labels at
+        the same city and across each road it relaxes, if the combined coins
+        fit the budget. The search stops once the smallest queued distances of
+        both sides add up to at least the best joined route.
+        Returns: (path, total_distance, coins_used) or (None, None, None) if no path exists
+        """
+        self._reset_counters()
+        
+        # Per side: queue of (distance, coins_used, label), label cities/parents,
+        # Pareto fronts of pushed labels, and settled labels per city
+        sides = []
+        for root in (start_city, goal_city):
+            sides.append({
+                'pq': [(0, 0, 0)],
+                'cities': [root],
+                'parents': [-1],
+                'fronts': {root: [(0, 0)]},
+                'settled': {},
+            })
+        
+        best = (math.inf, None, None, None)  # (distance, coins, forward label, backward label)
+        
+        while True:
+            top_forward = sides[0]['pq'][0][0] if sides[0]['pq'] else math.inf
+            top_backward = sides[1]['pq'][0][0] if sides[1]['pq'] else math.inf
+            
+            if top_forward == math.inf and top_backward == math.inf:
+                break
+            
+            # Once both roots are settled, no unsettled pair of labels can
+            # still beat the best joined route
+            if sides[0]['settled'] and sides[1]['settled'] and top_forward + top_backward >= best[0]:
+                break
+            
+            direction = 0 if top_forward <= top_backward else 1
+            side = sides[direction]
+            other = sides[1 - direction]
+            distance, coins_used, label = heapq.heappop(side['pq'])
+            current_city = side['cities'][label]
+            
+            if not _has_label(side['fronts'][current_city], distance, coins_used):
+                self.stale_skips += 1
+                continue
+            
+            self.expansions += 1
+            settled = side['settled'].setdefault(current_city, ([], [], []))
+            settled[0].append(distance)
+            settled[1].append(-coins_used)
+            settled[2].append(label)
+            
+            # Join with the other side at this city
+            if current_city in other['settled']:
+                match = _best_settled(other['settled'][current_city], max_coins - coins_used)
+                if match is not None and distance + match[0] < best[0]:
+                    labels = (label, match[2]) if direction == 0 else (match[2], label)
+                    best = (distance + match[0], coins_used + match[1], *labels)
+            
+            for neighbor_city, road in current_city.roads.items():
+                new_coins = coins_used + road.coins
+                if new_coins > max_coins:
+                    self.pruned_by_budget += 1
+                    continue
+                new_distance = distance + road.distance
+                
+                # Join with the other side across this road
+                if neighbor_city in other['settled']:
+                    match = _best_settled(other['settled'][neighbor_city], max_coins - new_coins)
+                    if match is not None and new_distance + match[0] < best[0]:
+                        labels = (label, match[2]) if direction == 0 else (match[2], label)
+                        best = (new_distance + match[0], new_coins + match[1], *labels)
+                
+                front = side['fronts'].setdefault(neighbor_city, [])
+                inserted, evicted = _insert_label(front, new_distance, new_coins)
+                self.pruned_labels += evicted
+                if not inserted:
+                    self.pruned_labels += 1
+                    continue
+                
+                side['cities'].append(neighbor_city)
+                side['parents'].append(label)
+                heapq.heappush(side['pq'], (new_distance, new_coins, len(side['cities']) - 1))
+                if len(side['pq']) > self.max_heap:
+                    self.max_heap = len(side['pq'])
+        
+        self.pushes = len(sides[0]['cities']) + len(sides[1]['cities']) - 2
+        distance, coins_used, forward_label, backward_label = best
+        if forward_label is None:
+            return None, None, None
+        
+        forward = _reconstruct_path(sides[0]['cities'], sides[0]['parents'], forward_label)
+        backward = _reconstruct_path(sides[1]['cities'], sides[1]['parents'], backward_label)
+        backward.reverse()
+        if forward[-1] is backward[0]:
+            backward = backward[1:]  # joined at a city rather than across a road
+        return forward + backward, distance, coins_used
+    
+    @instrumented()
+    def a_star_compiled(self, graph, start_name: str, goal_name: str, max_coins: int,
+                        heuristic=None, bounds=None):
+        """
+        A* algorithm with coin constraint over a CompiledGraph
+        Uses Pareto-dominance pruning and predecessor links on integer city ids.
+        heuristic is a HeuristicProvider; by default the stored values are used.
+        bounds is a GoalBounds cache used as in a_star_with_coins.
+        Returns: (path of city names, total_distance, coins_used) or (None, None, None)
+        """
+        start = graph.index_of(start_name)
+        goal = graph.index_of(goal_name)
+        offsets = graph.offsets
+        targets = graph.targets
+        distances = graph.distances
+        coins = graph.coins
+        self._reset_counters()
+        if bounds is not None:
+            min_distance, min_coins = bounds.for_goal_id(graph, goal)
+            if min_coins[start] > max_coins:
+                return None, None, None
+            h_of = min_distance.__getitem__
+        else:
+            min_coins = None
+            h_of = (heuristic or StoredHeuristic()).for_goal_id(graph, goal)
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+        
+        # Priority queue: (f_score, distance, coins_used, label)
+        pq = [(h_of(start), 0, 0, 0)]
+        label_cities = [start]
+        label_parents = [-1]
+        fronts = {start: [(0, 0)]}
+        
+        while pq:
+            f_score, distance, coins_used, label = heappop(pq)
+            current = label_cities[label]
+            
+            if not _has_label(fronts[current], distance, coins_used):
+                self.stale_skips += 1
+                continue
+            
+            self.expansions += 1
+            
+            if current == goal:
+                path = _reconstruct_path(label_cities, label_parents, label)
+                self.pushes = len(label_cities) - 1
+                return [graph.name_of(i) for i in path], distance, coins_used
+            
+            for k in range(offsets[current], offsets[current + 1]):
+                new_coins = coins_used + coins[k]
+                if new_coins > max_coins:
+                    self.pruned_by_budget += 1
+                    continue
+                
+                neighbor = targets[k]
+                if min_coins is not None and new_coins + min_coins[neighbor] > max_coins:
+                    self.pruned_labels += 1
+                    continue
+                new_distance = distance + distances[k]
+                front = fronts.get(neighbor)
+                if front is None:
+                    front = fronts[neighbor] = []
+                inserted, evicted = _insert_label(front, new_distance, new_coins)
+                self.pruned_labels += evicted
+                if not inserted:
+                    self.pruned_labels += 1
+                    continue
+                
+                label_cities.append(neighbor)
+                label_parents.append(label)
+                heappush(pq, (new_distance + h_of(neighbor), new_distance, new_coins, len(label_cities) - 1))
+                if len(pq) > self.max_heap:
+                    self.max_heap = len(pq)
+        
+        self.pushes = len(label_cities) - 1
+        return None, None, None
+    
+    @instrumented()
+    def pareto_fronts_compiled(self, graph, start_name: str, goal_names, max_coins: int,
+                               heuristic=None):
+        """
+        One multi-criteria label-setting search on a CompiledGraph from start to
+        several goals, answering every budget up to max_coins for each of them.
+        heuristic (must be consistent) is only used when there is a single goal.
+        Returns: dict mapping goal name to a ParetoFront with paths of city names
+        """
+        start = graph.index_of(start_name)
+        goals = {graph.index_of(name) for name in goal_names}
+        offsets = graph.offsets
+        targets = graph.targets
+        distances = graph.distances
+        coins = graph.coins
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+        self._reset_counters()
+        
+        if len(goals) == 1 and heuristic is not None:
+            h_of = heuristic.for_goal_id(graph, next(iter(goals)))
+        else:
+            h_of = ZeroHeuristic().for_goal_id(graph, start)
+        
+        pq = [(h_of(start), 0, 0, 0)]
+        label_cities = [start]
+        label_parents = [-1]
+        fronts = {start: [(0, 0)]}
+        # A single goal's routes can prune labels they dominate
+        goal_front = fronts.setdefault(next(iter(goals)), []) if len(goals) == 1 else None
+        goal_labels = {goal: [] for goal in goals}
+        
+        while pq:
+            f_score, distance, coins_used, label = heappop(pq)
+            current = label_cities[label]
+            
+            if not _has_label(fronts[current], distance, coins_used):
+                self.stale_skips += 1
+                continue
+            
+            self.expansions += 1
+            if current in goals:
+                goal_labels[current].append((coins_used, distance, label))
+                if goal_front is not None:
+                    continue
+            
+            for k in range(offsets[current], offsets[current + 1]):
+                new_coins = coins_used + coins[k]
+                if new_coins > max_coins:
+                    self.pruned_by_budget += 1
+                    continue
+                
+                neighbor = targets[k]
+                new_distance = distance + distances[k]
+                new_f = new_distance + h_of(neighbor)
+                if goal_front is not None:
+                    i = bisect_right(goal_front, (new_coins, math.inf))
+                    if i > 0 and goal_front[i - 1][1] <= new_f:
+                        self.pruned_labels += 1
+                        continue
+                
+                front = fronts.get(neighbor)
+                if front is None:
+                    front = fronts[neighbor] = []
+                inserted, evicted = _insert_label(front, new_distance, new_coins)
+                self.pruned_labels += evicted
+                if not inserted:
+                    self.pruned_labels += 1
+                    continue
+                
+                label_cities.append(neighbor)
+                label_parents.append(label)
+                heappush(pq, (new_f, new_distance, new_coins, len(label_cities) - 1))
+                if len(pq) > self.max_heap:
+                    self.max_heap = len(pq)
+        
+        results = {}
+        for goal, labels in goal_labels.items():
+            front = fronts.get(goal, [])
+            entries = []
+            for coins_used, distance, label in sorted(labels):
+                if _has_label(front, distance, coins_used):
+                    path = _reconstruct_path(label_cities, label_parents, label)
+                    entries.append((coins_used, distance, [graph.name_of(i) for i in path]))
+            results[graph.name_of(goal)] = ParetoFront(entries)
+        self.pushes = len(label_cities) - 1
+        return results
+    
+    def set_trace(self, trace):
+        """Turn tracing on with a SearchTrace, or off with None"""
+        self.trace = trace
+    
     def get_visited_cities(self):
-        """Returns list of cities visited during search"""
-        return self.visited_cities
+        """Returns list of cities visited during search (empty when tracing is off)"""
+        return self.trace.get_visited_cities() if self.trace is not None else []
     
     def get_explored_paths(self):
-        """Returns list of edges explored during search"""
-        return self.explored_paths
\ No newline at end of file
+        """Returns list of edges explored during search (empty when tracing is off)"""
+        return self.trace.get_explored_paths() if self.trace is not None else []
+    
+    def get_expansions(self):
+        """Returns number of labels expanded by the last search"""
+        return self.expansions
+    
+    def get_pushes(self):
+        """Returns number of labels pushed on the queue by the last search"""
+        return self.pushes
+    
+    def get_pruned_labels(self):
+        """Returns number of dominated labels dropped by the last pareto search"""
+        return self.pruned_labels
+    
+    def get_stats(self):
+        """Returns the SearchStats of the last search (None before the first)"""
+        return self.stats
+
+
+if __name__ == "__main__":
+    # `python3 -m pathfinder` runs the headless command line in cli.py
+    import sys
+    from cli import main
+    sys.exit(main())
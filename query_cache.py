@@ -0,0 +1,154 @@
+from bisect import insort
+from collections import OrderedDict, namedtuple
+from pathfinder import PathFinder, ParetoFront
+
+# A cached answer: trace is (visited_cities, explored_paths) when kept, else None.
+# Keeping traces needs a PathFinder with tracing on (e.g. a RingBufferTrace).
+CachedRoute = namedtuple('CachedRoute', ['path', 'distance', 'coins', 'trace'])
+
+
+class QueryCache:
+    """
+    Bounded LRU cache of PathFinder results keyed by (start, goal, max_coins).
+
+    Budget monotonicity lets one entry answer other budgets: an optimal route
+    using c coins found with budget B is also optimal for every budget in
+    [c, B], and no route at budget B means none at any smaller budget.
+    Cached Pareto fronts answer every budget up to the one they were built for.
+    Everything is dropped when the graph's version counter changes.
+    Reuse across budgets assumes optimal answers, so search_options should
+    use an admissible heuristic (e.g. heuristic=EuclideanHeuristic(graph)).
+    """
+
+    def __init__(self, graph, pathfinder=None, maxsize: int = 1024, keep_trace: bool = False,
+                 **search_options):
+        self.graph = graph
+        self.pathfinder = pathfinder or PathFinder()
+        self.maxsize = maxsize
+        self.keep_trace = keep_trace
+        self.search_options = search_options  # passed on to a_star_with_coins
+        self.entries = OrderedDict()  # Maps (start, goal, max_coins) to CachedRoute
+        self.budgets = {}  # Maps (start, goal) to the sorted budgets cached for it
+        self.fronts = OrderedDict()  # Maps (start, goal) to (max_coins, ParetoFront)
+        self.version = graph.version
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _check_version(self):
+        if self.graph.version != self.version:
+            self.clear()
+            self.version = self.graph.version
+            self.invalidations += 1
+
+    def _find(self, start_name, goal_name, max_coins):
+        """Look for an exact entry, then for one that answers max_coins by monotonicity"""
+        key = (start_name, goal_name, max_coins)
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+        pair = (start_name, goal_name)
+        if pair in self.fronts:
+            front_budget, front = self.fronts[pair]
+            if max_coins <= front_budget:
+                self.fronts.move_to_end(pair)
+                return CachedRoute(*front.best_for(max_coins), None)
+
+        for budget in self.budgets.get(pair, ()):
+            if budget < max_coins:
+                continue
+            entry = self.entries[(start_name, goal_name, budget)]
+            if entry.path is None or entry.coins <= max_coins:
+                self.entries.move_to_end((start_name, goal_name, budget))
+                return entry
+        return None
+
+    def _store(self, key, entry):
+        self.entries[key] = entry
+        insort(self.budgets.setdefault(key[:2], []), key[2])
+        while len(self.entries) + len(self.fronts) > self.maxsize:
+            self._evict()
+
+    def _evict(self):
+        """Drop the least recently used route, or a front if no routes are left"""
+        if self.entries:
+            start_name, goal_name, budget = self.entries.popitem(last=False)[0]
+            budgets = self.budgets[(start_name, goal_name)]
+            budgets.remove(budget)
+            if not budgets:
+                del self.budgets[(start_name, goal_name)]
+        else:
+            self.fronts.popitem(last=False)
+        self.evictions += 1
+
+    def lookup(self, start_name: str, goal_name: str, max_coins: int):
+        """Return the CachedRoute for a query, running the search on a miss"""
+        self._check_version()
+        entry = self._find(start_name, goal_name, max_coins)
+        if entry is not None:
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        path, distance, coins = self.pathfinder.a_star_with_coins(
+            self.graph.get_city(start_name), self.graph.get_city(goal_name), max_coins,
+            **self.search_options
+        )
+        trace = None
+        if self.keep_trace:
+            trace = (list(self.pathfinder.get_visited_cities()),
+                     list(self.pathfinder.get_explored_paths()))
+        entry = CachedRoute(path, distance, coins, trace)
+        self._store((start_name, goal_name, max_coins), entry)
+        return entry
+
+    def a_star_with_coins(self, start_city, goal_city, max_coins: int):
+        """Drop-in for PathFinder.a_star_with_coins served from the cache"""
+        entry = self.lookup(start_city.cityName, goal_city.cityName, max_coins)
+        return entry.path, entry.distance, entry.coins
+
+    def pareto_front(self, start_city, goal_city, max_coins: int, **options):
+        """PathFinder.pareto_front served from the cache; a larger cached front is reused"""
+        front = self.cached_front(start_city.cityName, goal_city.cityName, max_coins)
+        if front is None:
+            front = self.pathfinder.pareto_front(start_city, goal_city, max_coins, **options)
+            self.store_front(start_city.cityName, goal_city.cityName, max_coins, front)
+        return front
+
+    def cached_front(self, start_name: str, goal_name: str, max_coins: int):
+        """Cached ParetoFront answering max_coins (counted as a hit), else None (a miss)"""
+        self._check_version()
+        pair = (start_name, goal_name)
+        if pair in self.fronts and self.fronts[pair][0] >= max_coins:
+            self.hits += 1
+            self.fronts.move_to_end(pair)
+            front = self.fronts[pair][1]
+            return ParetoFront([entry for entry in front if entry[0] <= max_coins])
+        self.misses += 1
+        return None
+
+    def store_front(self, start_name: str, goal_name: str, max_coins: int, front):
+        """Cache a ParetoFront searched elsewhere (e.g. by another PathFinder) up to max_coins"""
+        self._check_version()
+        pair = (start_name, goal_name)
+        self.fronts[pair] = (max_coins, front)
+        self.fronts.move_to_end(pair)
+        while len(self.entries) + len(self.fronts) > self.maxsize:
+            self._evict()
+
+    def get_stats(self):
+        """Returns hit/miss/eviction/invalidation counters and the current size"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'size': len(self.entries) + len(self.fronts),
+        }
+
+    def clear(self):
+        self.entries.clear()
+        self.budgets.clear()
+        self.fronts.clear()
@@ -0,0 +1,116 @@
+import heapq
+import math
+from bisect import bisect_right
+from pathfinder import _insert_label, _has_label, _reconstruct_path
+
+
+class IncrementalPlanner:
+    """
+    Best remaining route to a fixed goal from wherever the player is.
+
+    One backward search from the goal grows Pareto fronts of
+    (coins, distance) labels toward every city, in distance order. Its queue
+    and labels are kept between queries, so a query only pops labels until
+    the asked-for city's answer is final, and later queries usually need no
+    extra work at all (LPA*-style reuse, extended with the coin resource).
+    A road added through CityGraph.connect_cities is repaired by extending the
+    labels of each endpoint across it; only the labels it improves propagate.
+    """
+
+    def __init__(self, graph, goal_city, max_coins: int):
+        self.graph = graph
+        self.goal_city = goal_city
+        self.max_coins = max_coins
+        # Queue of (distance, coins, label); each label's parent is the next city toward the goal
+        self.pq = [(0, 0, 0)]
+        self.label_cities = [goal_city]
+        self.label_parents = [-1]
+        self.fronts = {goal_city: [(0, 0)]}
+        self.labels = {(goal_city, 0, 0): 0}  # Maps (city, coins, distance) to its label
+        self.expansions = 0
+        graph.add_listener(self._on_graph_change)
+
+    def close(self):
+        """Stop listening to graph changes"""
+        self.graph.remove_listener(self._on_graph_change)
+
+    def _push(self, city, distance, coins, parent):
+        if coins > self.max_coins:
+            return
+        front = self.fronts.setdefault(city, [])
+        inserted, _ = _insert_label(front, distance, coins)
+        if not inserted:
+            return
+        self.label_cities.append(city)
+        self.label_parents.append(parent)
+        label = len(self.label_cities) - 1
+        self.labels[(city, coins, distance)] = label
+        heapq.heappush(self.pq, (distance, coins, label))
+
+    def _expand(self):
+        """Pop one live label and extend it over every road"""
+        distance, coins, label = heapq.heappop(self.pq)
+        city = self.label_cities[label]
+        if not _has_label(self.fronts[city], distance, coins):
+            return
+        self.expansions += 1
+        for neighbor_city, road in city.roads.items():
+            self._push(neighbor_city, distance + road.distance, coins + road.coins, label)
+
+    def _best_label(self, city, coins_left):
+        """Shortest known (distance, coins) from city with at most coins_left coins, or None"""
+        front = self.fronts.get(city, ())
+        i = bisect_right(front, (coins_left, math.inf))
+        if i == 0:
+            return None
+        coins, distance = front[i - 1]
+        return distance, coins
+
+    def _is_final(self, best):
+        # Queued labels are never shorter than the queue's top, so the answer
+        # is final once the top is no shorter than it
+        return not self.pq or (best is not None and self.pq[0][0] >= best[0])
+
+    def advance(self, city, coins_left: int, max_pops: int):
+        """
+        Pop at most max_pops labels toward city's answer, so a long first
+        search can be spread over several calls.
+        Returns True once best_route(city, coins_left) needs no more work.
+        """
+        coins_left = min(coins_left, self.max_coins)
+        best = self._best_label(city, coins_left)
+        for _ in range(max_pops):
+            if self._is_final(best):
+                return True
+            self._expand()
+            best = self._best_label(city, coins_left)
+        return self._is_final(best)
+
+    def best_route(self, city, coins_left: int):
+        """
+        Returns: (path from city to the goal, total_distance, coins_used)
+        or (None, None, None) if the goal cannot be reached with coins_left
+        """
+        coins_left = min(coins_left, self.max_coins)
+        best = self._best_label(city, coins_left)
+        while not self._is_final(best):
+            self._expand()
+            best = self._best_label(city, coins_left)
+
+        if best is None:
+            return None, None, None
+        distance, coins = best
+        path = _reconstruct_path(self.label_cities, self.label_parents, self.labels[(city, coins, distance)])
+        path.reverse()
+        return path, distance, coins
+
+    def _on_graph_change(self, event, *args):
+        if event != "road":
+            return  # a new city has no roads yet
+        city1, city2 = args
+        road = city1.roads[city2]
+        # Extend every live label of each endpoint across the new road
+        for here, there in ((city1, city2), (city2, city1)):
+            for coins, distance in list(self.fronts.get(here, ())):
+                self._push(there, distance + road.distance, coins + road.coins,
+                           self.labels[(here, coins, distance)])
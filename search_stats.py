@@ -0,0 +1,186 @@
+import functools
+import json
+import sys
+import threading
+import time
+from collections import Counter
+
+
+class SearchStats:
+    """
+    Counters and timings of one PathFinder query.
+    pops = expansions + stale_skips, where a stale skip is a popped label
+    already beaten at its city. pruned_by_budget counts roads whose coins
+    would overrun the budget; pruned_labels counts labels dropped by
+    dominance or by a coin lower bound. Labels are kept until the search
+    returns (for path reconstruction), so peak_labels, the label memory
+    measure, is a count of labels (not bytes) taken at the end; max_heap is
+    the largest queue size along the way.
+    """
+    FIELDS = ('method', 'start', 'goal', 'budget', 'found', 'distance', 'wall_time', 'pops',
+              'expansions', 'stale_skips', 'pushes', 'pruned_labels', 'pruned_by_budget',
+              'max_heap', 'peak_labels', 'profile')
+
+    def __init__(self, method: str, start=None, goal=None, budget=None):
+        self.method = method
+        self.start = start
+        self.goal = goal
+        self.budget = budget
+        self.found = False
+        self.distance = None
+        self.wall_time = 0.0
+        self.pops = 0
+        self.expansions = 0
+        self.stale_skips = 0
+        self.pushes = 0
+        self.pruned_labels = 0
+        self.pruned_by_budget = 0
+        self.max_heap = 0
+        self.peak_labels = 0
+        self.profile = None  # [(location, samples)] when the query was profiled
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def to_json(self):
+        return json.dumps(self.to_dict())
+
+    def __repr__(self):
+        return (f"SearchStats({self.method}, pops={self.pops}, pushes={self.pushes}, "
+                f"max_heap={self.max_heap}, wall_time={self.wall_time * 1000:.3f}ms)")
+
+
+class JsonLinesWriter:
+    """
+    Stats sink writing one JSON object per query, e.g.
+    PathFinder(stats_sink=JsonLinesWriter("queries.jsonl")).
+    Accepts a path (opened for appending) or an open text file.
+    """
+
+    def __init__(self, file):
+        self.owns_file = isinstance(file, str)
+        self.file = open(file, 'a') if self.owns_file else file
+
+    def __call__(self, stats):
+        self.file.write(stats.to_json() + "\n")
+
+    def close(self):
+        if self.owns_file:
+            self.file.close()
+        else:
+            self.file.flush()
+
+
+class SamplingProfiler:
+    """
+    Samples the stack of one thread from a background thread every interval
+    seconds and counts the innermost frames it lands in. The sampler only
+    runs between start() and stop(), so it costs nothing when unused.
+    """
+
+    def __init__(self, interval: float = 0.001, top: int = 10):
+        self.interval = interval
+        self.top = top
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self, thread_id: int = None):
+        target = thread_id if thread_id is not None else threading.get_ident()
+        self.samples = Counter()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(target,), daemon=True)
+        self._thread.start()
+
+    def _run(self, target: int):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(target)
+            if frame is not None:
+                code = frame.f_code
+                location = f"{code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno} {code.co_name}"
+                # Once stop() is called the target is waiting for this thread, not searching
+                if self._stop.is_set():
+                    break
+                self.samples[location] += 1
+
+    def stop(self):
+        """
+        Stop sampling and return the top locations as [(location, samples)].
+        Samples read after stop() was called are dropped.
+        """
+        self._stop.set()
+        self._thread.join()
+        return self.samples.most_common(self.top)
+
+
+def _query_value(value):
+    """City objects are reported by name so stats stay JSON-serialisable"""
+    if hasattr(value, 'cityName'):
+        return value.cityName
+    if isinstance(value, (tuple, list, set, frozenset)):
+        return [_query_value(v) for v in value]
+    return value
+
+
+def instrumented(roots: int = 1):
+    """
+    Wrap a PathFinder search so each call leaves a SearchStats in
+    pathfinder.stats and hands it to pathfinder.stats_sink.
+    The search resets and updates the counters on the PathFinder; roots is
+    the number of labels it starts with. The wrapped method accepts
+    profile=True to sample that one query with a SamplingProfiler.
+    Nested searches (one method delegating to another) report once.
+    """
+    def decorate(search):
+        code = search.__code__
+        names = code.co_varnames[1:code.co_argcount]
+        where = {}
+        for role, candidates in (('start', ('start_city', 'start_name')),
+                                 ('goal', ('goal_city', 'goal_name', 'goal_names')),
+                                 ('budget', ('max_coins', 'budgets'))):
+            for name in candidates:
+                if name in names:
+                    where[role] = (names.index(name), name)
+
+        @functools.wraps(search)
+        def wrapper(self, *args, profile: bool = False, **kwargs):
+            if self._searching:
+                return search(self, *args, **kwargs)
+            query = {role: _query_value(args[i] if i < len(args) else kwargs.get(name))
+                     for role, (i, name) in where.items()}
+            stats = SearchStats(search.__name__, **query)
+            profiler = SamplingProfiler(self.profile_interval) if profile else None
+            self._searching = True
+            if profiler is not None:
+                profiler.start()
+            started = time.perf_counter()
+            try:
+                result = search(self, *args, **kwargs)
+            finally:
+                ended = time.perf_counter()
+                if profiler is not None:
+                    stats.profile = profiler.stop()
+                stats.wall_time = ended - started
+                self._searching = False
+
+            if isinstance(result, tuple):
+                stats.distance = result[1]
+                stats.found = result[0] is not None
+            elif isinstance(result, dict):
+                stats.found = any(len(front) for front in result.values())
+            else:
+                stats.found = len(result) > 0
+            stats.expansions = self.expansions
+            stats.stale_skips = self.stale_skips
+            stats.pops = self.expansions + self.stale_skips
+            stats.pushes = self.pushes
+            stats.pruned_labels = self.pruned_labels
+            stats.pruned_by_budget = self.pruned_by_budget
+            stats.max_heap = self.max_heap
+            stats.peak_labels = self.pushes + roots
+            self.stats = stats
+            if self.stats_sink is not None:
+                self.stats_sink(stats)
+            return result
+        return wrapper
+    return decorate
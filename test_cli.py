@@ -0,0 +1,48 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from cli import main
+from graph import create_sample_graph
+
+
+class CommandLineTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.graph_path = os.path.join(directory.name, "sample.ccpf")
+        create_sample_graph().compile().save(self.graph_path)
+        self.batch_path = os.path.join(directory.name, "queries.txt")
+        with open(self.batch_path, 'w') as f:
+            f.write("A B 4\nA A 4\n")
+
+    def run_main(self, *argv):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            status = main([self.graph_path, *argv])
+        return status, [json.loads(line) for line in out.getvalue().splitlines()]
+
+    def test_workers_rejects_options_the_batch_engine_ignores(self):
+        for option in (["--stats"], ["--heuristic", "zero"], ["--tables", "tables.apt"]):
+            with self.subTest(option=option), self.assertRaises(SystemExit), \
+                    contextlib.redirect_stderr(io.StringIO()) as err:
+                main([self.graph_path, "--batch", self.batch_path, "--workers", "0", *option])
+            self.assertIn("does not support", err.getvalue())
+
+    def test_workers_gives_the_same_answers(self):
+        status, plain = self.run_main("--batch", self.batch_path)
+        self.assertEqual(status, 0)
+        status, grouped = self.run_main("--batch", self.batch_path, "--workers", "0")
+        self.assertEqual(status, 0)
+        key = lambda record: (record["start"], record["goal"])
+        self.assertEqual(sorted(grouped, key=key), sorted(plain, key=key))
+
+    def test_stats_without_workers(self):
+        _, records = self.run_main("--batch", self.batch_path, "--stats")
+        self.assertTrue(all("stats" in record for record in records))
+
+
+if __name__ == "__main__":
+    unittest.main()
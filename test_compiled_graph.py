@@ -0,0 +1,91 @@
+import os
+import pickle
+import tempfile
+import unittest
+from all_pairs import AllPairsTables
+from batch import BatchRunner
+from compiled_graph import CompiledGraph
+from heuristics import EuclideanHeuristic
+from pathfinder import PathFinder
+from test_contraction import brute_force
+from test_pathfinder import BUDGETS, BruteForceTestCase, random_graphs
+
+
+def road_table(graph):
+    """Maps (city, neighbor) names to (distance, coins) for every road of a CityGraph"""
+    return {(name, neighbor.cityName): (road.distance, road.coins)
+            for name, city in graph.cities.items() for neighbor, road in city.roads.items()}
+
+
+class MappedGraphTest(BruteForceTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def open_saved(self, compiled, name):
+        path = os.path.join(self.directory, name)
+        compiled.save(path)
+        opened = CompiledGraph.open(path)
+        self.addCleanup(opened.close)
+        return opened
+
+    def test_save_open_pickle_then_search_matches_brute_force(self):
+        for number, graph in enumerate(random_graphs(6)):
+            compiled = graph.compile()
+            opened = self.open_saved(compiled, f"graph{number}.ccpf")
+            shipped = pickle.loads(pickle.dumps(opened))  # mapped again from its path
+            self.addCleanup(shipped.close)
+            self.assertIsNotNone(shipped._mmap)
+            names = graph.get_city_names()
+            for version in (compiled, opened, shipped):
+                pathfinder = PathFinder()
+                heuristic = EuclideanHeuristic(version)
+                for start in names:
+                    expected = brute_force(graph, start, BUDGETS)
+                    for goal in names:
+                        for budget in BUDGETS:
+                            answer = pathfinder.a_star_compiled(version, start, goal, budget, heuristic=heuristic)
+                            with self.subTest(start=start, goal=goal, budget=budget):
+                                self.assertOptimalRoute(graph, expected, start, goal, budget, *answer)
+
+    def test_round_trip_keeps_cities_and_roads(self):
+        graph = random_graphs(1)[0]
+        graph.add_city("Zürich", 7, 12, 34)  # multi-byte name, decoded from the file on demand
+        graph.connect_cities("Zürich", "c0", 40, 2)
+        opened = self.open_saved(graph.compile(), "graph.ccpf")
+        self.assertEqual([opened.index_of(name) for name in graph.get_city_names()],
+                         list(range(len(graph.cities))))
+        self.assertEqual(opened.min_distance_per_unit, graph.min_distance_per_unit)
+
+        rebuilt = opened.to_city_graph()
+        self.assertEqual(road_table(rebuilt), road_table(graph))
+        self.assertEqual(rebuilt.positions, graph.positions)
+        self.assertEqual({name: city.get_heuristic() for name, city in rebuilt.cities.items()},
+                         {name: city.get_heuristic() for name, city in graph.cities.items()})
+
+    def test_worker_pools_give_the_same_answers(self):
+        graph = random_graphs(1)[0]
+        compiled = graph.compile()
+        names = graph.get_city_names()
+        queries = [(start, goal, budget) for start in names[:4] for goal in names for budget in BUDGETS]
+        for version in (compiled, self.open_saved(compiled, "graph.ccpf")):
+            answers = [sorted(BatchRunner(version, workers=workers).run(queries)) for workers in (0, 2)]
+            self.assertEqual(answers[0], answers[1])
+            tables = [AllPairsTables.build(version, os.path.join(self.directory, f"tables{workers}.apt"),
+                                           workers=workers, chunk=5) for workers in (0, 2)]
+            for table in tables:
+                self.addCleanup(table.close)
+            self.assertEqual(list(tables[0].distances), list(tables[1].distances))
+            self.assertEqual(list(tables[0].coins), list(tables[1].coins))
+
+    def test_open_rejects_other_files(self):
+        path = os.path.join(self.directory, "not_a_graph")
+        with open(path, 'wb') as f:
+            f.write(b"\0" * 64)
+        with self.assertRaisesRegex(ValueError, "not a mapped graph file"):
+            CompiledGraph.open(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import heapq
+import unittest
+from contraction import ContractionHierarchy
+from generators import random_graph
+
+
+def brute_force(graph, start_name, budgets):
+    """
+    Shortest distance from start to every city for each budget, by Dijkstra
+    over (city, coins used) states. Returns {(city name, budget): distance}.
+    """
+    cap = max(budgets)
+    best = {}
+    pq = [(0, 0, start_name)]
+    while pq:
+        distance, coins, name = heapq.heappop(pq)
+        if (name, coins) in best:
+            continue
+        best[(name, coins)] = distance
+        for neighbor, road in graph.cities[name].roads.items():
+            new_coins = coins + road.coins
+            if new_coins <= cap and (neighbor.cityName, new_coins) not in best:
+                heapq.heappush(pq, (distance + road.distance, new_coins, neighbor.cityName))
+    answers = {}
+    for (name, coins), distance in best.items():
+        for budget in budgets:
+            if coins <= budget and distance < answers.get((name, budget), float('inf')):
+                answers[(name, budget)] = distance
+    return answers
+
+
+class ContractionHierarchyTest(unittest.TestCase):
+    BUDGETS = (0, 4, 7, 12)
+
+    def check(self, graph, hierarchy):
+        names = graph.get_city_names()
+        for start in names:
+            expected = brute_force(graph, start, self.BUDGETS)
+            for goal in names:
+                for budget in self.BUDGETS:
+                    path, distance, coins = hierarchy.route(start, goal, budget)
+                    with self.subTest(start=start, goal=goal, budget=budget):
+                        self.assertEqual(distance, expected.get((goal, budget)))
+                        if path is None:
+                            continue
+                        self.assertEqual((path[0], path[-1]), (start, goal))
+                        self.assertEqual(len(set(path)), len(path), "route visits a city twice")
+                        roads = [graph.cities[a].roads[graph.cities[b]] for a, b in zip(path, path[1:])]
+                        self.assertEqual(sum(road.distance for road in roads), distance)
+                        self.assertEqual(sum(road.coins for road in roads), coins)
+                        self.assertLessEqual(coins, budget)
+
+    def test_matches_brute_force_on_random_graphs(self):
+        # Distances ignore positions here, unlike the generated geometric graphs
+        for seed in range(40):
+            n = 10 + seed % 6
+            graph = random_graph(n, degree=4.4, seed=seed)
+            self.check(graph, ContractionHierarchy.build(graph))
+
+    def test_contracting_a_witness_invalidates_queued_plans(self):
+        # A queued plan relied on a witness through a city contracted before
+        # it, so the shortcut it skipped was missing (c1-c10 came out too long)
+        graph = random_graph(11, degree=6.0, seed=211)
+        self.check(graph, ContractionHierarchy.build(graph))
+
+    def test_matches_brute_force_with_short_witness_searches(self):
+        for seed in range(10):
+            graph = random_graph(14, degree=5.0, seed=100 + seed)
+            self.check(graph, ContractionHierarchy.build(graph, witness_limit=2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import tempfile
+import unittest
+from array import array
+from graph import CityGraph
+from loaders import HEADER, MAGIC, build_graph, load_binary
+
+
+class SelfLoopTest(unittest.TestCase):
+    def setUp(self):
+        self.graph = CityGraph()
+        self.graph.add_cities([("A", 0, 0, 0), ("B", 0, 3, 4)])
+
+    def test_connect_cities_rejects_self_loop(self):
+        with self.assertRaisesRegex(ValueError, "A cannot be connected to itself"):
+            self.graph.connect_cities("A", "A", 1, 0)
+        self.assertEqual(self.graph.road_entries, 0)
+
+    def test_connect_many_rejects_self_loop_with_and_without_checks(self):
+        for check_duplicates in (True, False):
+            with self.assertRaisesRegex(ValueError, "A cannot be connected to itself"):
+                self.graph.connect_many([("A", "A", 1, 0)], check_duplicates=check_duplicates)
+        self.graph.validate_roads()
+
+    def test_failed_batch_keeps_counters_for_rows_before_it(self):
+        self.graph.add_city("C", 0, 6, 8)
+        version = self.graph.version
+        with self.assertRaisesRegex(ValueError, "C cannot be connected to itself"):
+            self.graph.connect_many([("A", "B", 1, 0), ("C", "C", 1, 0)])
+        self.assertIn(self.graph.cities["B"], self.graph.cities["A"].roads)
+        self.assertEqual(self.graph.road_entries, 2)
+        self.assertGreater(self.graph.version, version)
+        self.assertEqual(self.graph.min_distance_per_unit, 0.2)
+        self.graph.validate_roads()
+
+    def test_validate_roads_reports_self_loop(self):
+        city = self.graph.cities["A"]
+        city.roads[city] = None
+        with self.assertRaisesRegex(ValueError, "A is connected to itself"):
+            self.graph.validate_roads()
+
+    def test_validate_roads_reports_duplicates(self):
+        self.graph.connect_many([("A", "B", 5, 0), ("B", "A", 6, 1)], check_duplicates=False)
+        with self.assertRaisesRegex(ValueError, "duplicate roads"):
+            self.graph.validate_roads()
+
+    def test_connect_many_still_reports_duplicates(self):
+        self.graph.connect_cities("A", "B", 5, 0)
+        with self.assertRaisesRegex(ValueError, "already connected"):
+            self.graph.connect_many([("B", "A", 6, 1)])
+
+    def test_loaders_reject_self_loop(self):
+        for compiled in (False, True):
+            with self.assertRaisesRegex(ValueError, "A cannot be connected to itself"):
+                build_graph(None, [("A", "B", 5, 0), ("A", "A", 1, 0)], compiled=compiled)
+
+    def test_binary_loader_rejects_self_loop(self):
+        # save_binary cannot write a self-loop, so the file is written by hand
+        fd, path = tempfile.mkstemp(suffix=".bin")
+        self.addCleanup(os.remove, path)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, 2, 1))
+            f.write(array('I', [1, 1]).tobytes() + b"AB")
+            f.write(array('d', [0.0] * 6).tobytes())
+            for typecode, value in zip('iidi', (0, 0, 1.0, 0)):
+                f.write(array(typecode, [value]).tobytes())
+        for compiled in (False, True):
+            with self.assertRaisesRegex(ValueError, "A cannot be connected to itself"):
+                load_binary(path, compiled=compiled)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import unittest
+from batch import BatchRunner
+from compiled_graph import CompiledGraph
+from generators import random_graph
+from graph import create_sample_graph
+from heuristics import EuclideanHeuristic
+from pathfinder import PathFinder
+from test_contraction import brute_force
+
+BUDGETS = (0, 3, 7, 12)
+
+
+def random_graphs(count: int = 12):
+    """Small random graphs whose distances ignore positions, so heuristics are not exact"""
+    return [random_graph(12 + seed % 5, degree=4.0, seed=seed) for seed in range(count)]
+
+
+class BruteForceTestCase(unittest.TestCase):
+    def assertOptimalRoute(self, graph, expected, start, goal, budget, path, distance, coins):
+        """Compare a search answer with brute_force() and check the route adds up"""
+        self.assertEqual(distance, expected.get((goal, budget)))
+        if path is None:
+            return
+        names = [city if isinstance(city, str) else city.cityName for city in path]
+        self.assertEqual((names[0], names[-1]), (start, goal))
+        roads = [graph.cities[a].roads[graph.cities[b]] for a, b in zip(names, names[1:])]
+        self.assertEqual(sum(road.distance for road in roads), distance)
+        self.assertEqual(sum(road.coins for road in roads), coins)
+        self.assertLessEqual(coins, budget)
+
+
+class AStarWithCoinsTest(BruteForceTestCase):
+    def check(self, options=lambda graph: {}, count: int = 12):
+        for graph in random_graphs(count):
+            pathfinder = PathFinder()
+            search_options = options(graph)
+            names = graph.get_city_names()
+            for start in names:
+                expected = brute_force(graph, start, BUDGETS)
+                for goal in names:
+                    for budget in BUDGETS:
+                        answer = pathfinder.a_star_with_coins(graph.cities[start], graph.cities[goal],
+                                                              budget, **search_options)
+                        with self.subTest(start=start, goal=goal, budget=budget):
+                            self.assertOptimalRoute(graph, expected, start, goal, budget, *answer)
+
+    def test_state_per_coin_total(self):
+        self.check()
+
+    def test_pareto_mode(self):
+        self.check(lambda graph: {'pareto': True})
+
+    def test_pareto_mode_with_euclidean_heuristic(self):
+        self.check(lambda graph: {'pareto': True, 'heuristic': EuclideanHeuristic(graph)}, count=6)
+
+
+class BidirectionalTest(BruteForceTestCase):
+    def check(self, graph):
+        pathfinder = PathFinder()
+        names = graph.get_city_names()
+        for start in names:
+            expected = brute_force(graph, start, BUDGETS)
+            for goal in names:
+                for budget in BUDGETS:
+                    answer = pathfinder.bidirectional_with_coins(graph.cities[start], graph.cities[goal], budget)
+                    with self.subTest(start=start, goal=goal, budget=budget):
+                        self.assertOptimalRoute(graph, expected, start, goal, budget, *answer)
+
+    def test_matches_brute_force(self):
+        for graph in random_graphs():
+            self.check(graph)
+
+    def test_stopping_rule_on_long_routes(self):
+        # Sparse graphs give routes of many roads, where the two searches
+        # first meet well before the best joined route is known
+        for seed in range(3):
+            self.check(random_graph(30, degree=2.4, seed=50 + seed))
+
+
+class ParetoFrontTest(BruteForceTestCase):
+    def check(self, options=lambda graph: {}, count: int = 12):
+        for graph in random_graphs(count):
+            pathfinder = PathFinder()
+            search_options = options(graph)
+            names = graph.get_city_names()
+            for start in names:
+                expected = brute_force(graph, start, BUDGETS)
+                for goal in names:
+                    # One sweep up to the largest budget answers all the smaller ones
+                    front = pathfinder.pareto_front(graph.cities[start], graph.cities[goal],
+                                                    max(BUDGETS), **search_options)
+                    coins = [entry[0] for entry in front]
+                    distances = [entry[1] for entry in front]
+                    self.assertEqual(coins, sorted(set(coins)))
+                    self.assertEqual(distances, sorted(set(distances), reverse=True))
+                    for budget in BUDGETS:
+                        with self.subTest(start=start, goal=goal, budget=budget):
+                            self.assertOptimalRoute(graph, expected, start, goal, budget,
+                                                    *front.best_for(budget))
+
+    def test_matches_brute_force_at_every_budget(self):
+        self.check()
+
+    def test_goal_front_pruning_with_euclidean_heuristic(self):
+        self.check(lambda graph: {'heuristic': EuclideanHeuristic(graph)}, count=6)
+
+
+class ParetoFrontsCompiledTest(unittest.TestCase):
+    def setUp(self):
+        self.graph = CompiledGraph.from_city_graph(create_sample_graph())
+
+    def test_start_is_the_only_goal(self):
+        fronts = PathFinder().pareto_fronts_compiled(self.graph, "A", ["A"], 4)
+        self.assertEqual(fronts["A"].best_for(0), (["A"], 0, 0))
+
+    def test_start_among_several_goals(self):
+        fronts = PathFinder().pareto_fronts_compiled(self.graph, "A", ["A", "B"], 4)
+        self.assertEqual(fronts["A"].best_for(4), (["A"], 0, 0))
+        self.assertIsNotNone(fronts["B"].best_for(4)[0])
+
+    def test_batch_query_from_a_city_to_itself(self):
+        results = list(BatchRunner(self.graph, workers=0).run([("A", "A", 4)]))
+        self.assertEqual([(r.path, r.distance, r.coins) for r in results], [(["A"], 0, 0)])
+
+
+if __name__ == "__main__":
+    unittest.main()
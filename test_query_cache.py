@@ -0,0 +1,68 @@
+import unittest
+from heuristics import EuclideanHeuristic
+from query_cache import QueryCache
+from test_contraction import brute_force
+from test_pathfinder import BUDGETS, BruteForceTestCase, random_graphs
+
+
+class QueryCacheTest(BruteForceTestCase):
+    def check_all_pairs(self, graph, cache, budgets):
+        names = graph.get_city_names()
+        for start in names:
+            expected = brute_force(graph, start, BUDGETS)
+            for goal in names:
+                for budget in budgets:
+                    entry = cache.lookup(start, goal, budget)
+                    with self.subTest(start=start, goal=goal, budget=budget):
+                        self.assertOptimalRoute(graph, expected, start, goal, budget,
+                                                entry.path, entry.distance, entry.coins)
+
+    def test_reuse_across_budgets_matches_brute_force(self):
+        for graph in random_graphs(6):
+            cache = QueryCache(graph, heuristic=EuclideanHeuristic(graph))
+            # Largest budget first, so smaller ones can be answered by monotonicity
+            self.check_all_pairs(graph, cache, sorted(BUDGETS, reverse=True))
+            self.assertGreater(cache.hits, 0)
+            misses = cache.misses
+            self.check_all_pairs(graph, cache, BUDGETS)
+            self.assertEqual(cache.misses, misses)
+
+    def test_cached_front_answers_smaller_budgets(self):
+        for graph in random_graphs(4):
+            cache = QueryCache(graph)
+            names = graph.get_city_names()
+            for start in names:
+                expected = brute_force(graph, start, BUDGETS)
+                for goal in names:
+                    cities = graph.cities[start], graph.cities[goal]
+                    cache.pareto_front(*cities, max(BUDGETS))
+                    for budget in BUDGETS:
+                        with self.subTest(start=start, goal=goal, budget=budget):
+                            self.assertOptimalRoute(graph, expected, start, goal, budget,
+                                                    *cache.pareto_front(*cities, budget).best_for(budget))
+            self.assertEqual(cache.misses, len(names) ** 2)
+
+    def test_graph_change_invalidates(self):
+        for graph in random_graphs(6):
+            cache = QueryCache(graph, heuristic=EuclideanHeuristic(graph))
+            self.check_all_pairs(graph, cache, BUDGETS)
+            # A free, short road to the city furthest from the first one changes cached answers
+            start = graph.get_city_names()[0]
+            distances = brute_force(graph, start, (max(BUDGETS),))
+            goal = max((name for (name, _), distance in distances.items()
+                        if graph.cities[name] not in graph.cities[start].roads and name != start),
+                       key=lambda name: distances[(name, max(BUDGETS))])
+            graph.connect_cities(start, goal, 1, 0)
+            self.check_all_pairs(graph, cache, BUDGETS)
+            self.assertEqual(cache.invalidations, 1)
+
+    def test_lru_eviction_keeps_answers_correct(self):
+        graph = random_graphs(1)[0]
+        cache = QueryCache(graph, maxsize=5)
+        self.check_all_pairs(graph, cache, BUDGETS)
+        self.assertLessEqual(cache.get_stats()['size'], 5)
+        self.assertGreater(cache.evictions, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
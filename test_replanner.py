@@ -0,0 +1,24 @@
+import unittest
+from generators import random_graph
+from replanner import IncrementalPlanner
+
+
+class IncrementalPlannerTest(unittest.TestCase):
+    def test_advance_in_small_steps_gives_the_same_routes(self):
+        graph = random_graph(40, degree=4.0, seed=7)
+        names = graph.get_city_names()
+        goal = graph.cities[names[-1]]
+        stepped = IncrementalPlanner(graph, goal, 12)
+        for name in names:
+            city = graph.cities[name]
+            for coins_left in (0, 5, 12):
+                while not stepped.advance(city, coins_left, 3):
+                    pass
+                self.assertEqual(stepped.best_route(city, coins_left),
+                                 IncrementalPlanner(graph, goal, 12).best_route(city, coins_left))
+        # A settled answer needs no further steps
+        self.assertTrue(stepped.advance(graph.cities[names[0]], 12, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
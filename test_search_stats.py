@@ -0,0 +1,35 @@
+import unittest
+from generators import random_graph
+from pathfinder import PathFinder
+
+
+class SearchStatsTest(unittest.TestCase):
+    def setUp(self):
+        self.graph = random_graph(200, degree=4.0, seed=3)
+        self.start = self.graph.cities["c0"]
+        self.goal = self.graph.cities["c199"]
+
+    def test_counters_start_from_zero_for_each_search(self):
+        pathfinder = PathFinder()
+        pathfinder.pareto_front(self.start, self.goal, 12)
+        first = pathfinder.get_stats().to_dict()
+        pathfinder.a_star_with_coins(self.start, self.goal, 0, pareto=True)
+        pathfinder.pareto_front(self.start, self.goal, 12)
+        again = pathfinder.get_stats().to_dict()
+        for field in ('pops', 'expansions', 'stale_skips', 'pushes', 'pruned_labels',
+                      'pruned_by_budget', 'max_heap', 'peak_labels'):
+            self.assertEqual(again[field], first[field], field)
+        self.assertEqual(first['pops'], first['expansions'] + first['stale_skips'])
+
+    def test_profile_leaves_out_the_profiler_itself(self):
+        pathfinder = PathFinder()
+        pathfinder.profile_interval = 0.0001
+        for _ in range(20):
+            pathfinder.pareto_front(self.start, self.goal, 12, profile=True)
+            for location, _ in pathfinder.get_stats().profile:
+                self.assertNotIn("threading.py", location)
+                self.assertNotIn("search_stats.py", location)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+from collections import deque
+
+
+class SearchCancelled(Exception):
+    """Raised from a trace callback to abandon the search in progress"""
+
+
+class SearchTrace:
+    """
+    Receives exploration events from PathFinder.a_star_with_coins and pareto_front.
+    visit(city) is called when a city is popped and explore(city, neighbor)
+    when a road is relaxed. Tracing is off when PathFinder has no trace.
+    """
+
+    def reset(self):
+        """Called at the start of every search"""
+
+    def visit(self, city):
+        raise NotImplementedError
+
+    def explore(self, city, neighbor_city):
+        raise NotImplementedError
+
+    def get_visited_cities(self):
+        return []
+
+    def get_explored_paths(self):
+        return []
+
+
+class RingBufferTrace(SearchTrace):
+    """Keeps the last maxlen visits and explored roads of the current search"""
+
+    def __init__(self, maxlen: int = 10000):
+        self.visited = deque(maxlen=maxlen)
+        self.explored = deque(maxlen=maxlen)
+        self.seen = set()  # O(1) check that a city is only reported once
+
+    def reset(self):
+        self.visited.clear()
+        self.explored.clear()
+        self.seen.clear()
+
+    def visit(self, city):
+        if city not in self.seen:
+            self.seen.add(city)
+            self.visited.append(city)
+
+    def explore(self, city, neighbor_city):
+        self.explored.append((city, neighbor_city))
+
+    def get_visited_cities(self):
+        return list(self.visited)
+
+    def get_explored_paths(self):
+        return list(self.explored)
+
+
+class CallbackTrace(SearchTrace):
+    """
+    Streams events to callback(event, *cities) as they happen:
+    ("reset",), ("visit", city) the first time a city is popped,
+    and ("explore", city, neighbor_city) for every relaxed road.
+    Nothing is stored apart from the set of cities already visited.
+    The callback may raise SearchCancelled to stop the search; the
+    exception propagates out of the PathFinder call.
+    """
+
+    def __init__(self, callback):
+        self.callback = callback
+        self.seen = set()
+
+    def reset(self):
+        self.seen.clear()
+        self.callback("reset")
+
+    def visit(self, city):
+        if city not in self.seen:
+            self.seen.add(city)
+            self.callback("visit", city)
+
+    def explore(self, city, neighbor_city):
+        self.callback("explore", city, neighbor_city)
@@ -0,0 +1,93 @@
+import math
+from array import array
+
+
+class Viewport:
+    """
+    Graph-to-screen transform for a canvas of a given size, computed once.
+    Screen positions are kept in arrays indexed like names, so drawing and
+    hit-testing never walk the graph's positions again until the canvas is
+    resized or the graph changes.
+    """
+
+    def __init__(self, graph, width: int, height: int, margin: int = 40):
+        self.width = width
+        self.height = height
+        self.version = graph.version
+        self.names = graph.get_city_names()
+        self.index = {name: i for i, name in enumerate(self.names)}  # Maps city name to position slot
+
+        positions = [graph.get_position(name) for name in self.names]
+        min_x = min(x for x, _ in positions)
+        max_x = max(x for x, _ in positions)
+        min_y = min(y for _, y in positions)
+        max_y = max(y for _, y in positions)
+
+        graph_w = max_x - min_x
+        graph_h = max_y - min_y
+        usable_w = width - margin * 2
+        usable_h = height - margin * 2
+        scale_x = usable_w / graph_w if graph_w > 0 else 1
+        scale_y = usable_h / graph_h if graph_h > 0 else 1
+        self.scale = min(scale_x, scale_y)
+
+        scaled_w = graph_w * self.scale
+        scaled_h = graph_h * self.scale
+        self.offset_x = (width - scaled_w) // 2 - min_x * self.scale
+        self.offset_y = (height - scaled_h) // 2 - min_y * self.scale
+        self.radius = max(10, 20 * self.scale)  # city circle radius on screen
+
+        self.xs = array('d', [x * self.scale + self.offset_x for x, _ in positions])
+        self.ys = array('d', [y * self.scale + self.offset_y for _, y in positions])
+        self.grid = SpatialGrid(self.xs, self.ys, 2 * self.radius)
+
+    def is_current(self, graph, width: int, height: int):
+        """True while the canvas size and the graph are unchanged"""
+        return (self.width, self.height, self.version) == (width, height, graph.version)
+
+    def to_screen(self, x: float, y: float):
+        """Map a graph position to canvas coordinates"""
+        return x * self.scale + self.offset_x, y * self.scale + self.offset_y
+
+    def position(self, city_name: str):
+        """Canvas coordinates of a city"""
+        i = self.index[city_name]
+        return self.xs[i], self.ys[i]
+
+    def city_at(self, x: float, y: float):
+        """Name of the city drawn nearest to canvas point (x, y), if within its circle"""
+        i = self.grid.nearest(x, y, self.radius)
+        return None if i is None else self.names[i]
+
+
+class SpatialGrid:
+    """
+    Uniform grid over points: each cell_size square lists the points in it.
+    A query within radius <= cell_size only looks at the 3x3 cells around
+    the query point, so lookups cost O(1) for evenly spread points.
+    """
+
+    def __init__(self, xs, ys, cell_size: float):
+        self.xs = xs
+        self.ys = ys
+        self.cell_size = cell_size
+        self.cells = {}
+        for i in range(len(xs)):
+            self.cells.setdefault((int(xs[i] // cell_size), int(ys[i] // cell_size)), []).append(i)
+
+    def nearest(self, x: float, y: float, radius: float):
+        """Index of the point nearest to (x, y) within radius, or None"""
+        if radius > self.cell_size:
+            raise ValueError(f"Radius {radius} is larger than the cell size {self.cell_size}.")
+        cx = int(x // self.cell_size)
+        cy = int(y // self.cell_size)
+        best = None
+        best_distance = radius
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for i in self.cells.get((cx + dx, cy + dy), ()):
+                    distance = math.hypot(self.xs[i] - x, self.ys[i] - y)
+                    if distance <= best_distance:
+                        best = i
+                        best_distance = distance
+        return best